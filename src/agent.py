@@ -1,93 +1,240 @@
+import asyncio
 import json
+import re
 import time
 from typing import Dict, Any, Optional, List
-from src.prompt_library import get_prompt_template
+from src.prompt_library import split_prompt_template
 from src.llm import create_llm
-from src.vectorstore import retrieve_documents
+from src.vectorstore import retrieve_documents, aretrieve_documents, add_documents_to_store
 from src.schemas import validate_output, SCHEMA_MODELS
 from src.security import redact_pii
 from src.logging_config import logger
-from src.config import RETRIEVAL_TOP_K
+from src.response_cache import QueryCache, make_cache_key
+from src.io_utils import json_loads
+from src.config import RETRIEVAL_TOP_K, RESPONSE_CACHE_SEMANTIC, RAG_INCLUDE_CONTEXT_IN_RESULT
+
+# Optional ```json ... ``` fence around the model's JSON payload
+_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*(.*?)\s*```\s*$', re.S)
+
+def _error_info(exc: Exception, message: Optional[str] = None) -> Dict[str, str]:
+    """Describe an error by exception class name and message."""
+    return {'type': type(exc).__name__, 'msg': message or str(exc)}
+
+def _parse_json_response(text: str):
+    """Strip an optional Markdown code fence and parse the JSON payload."""
+    match = _FENCE_RE.match(text)
+    payload = match.group(1) if match else text.strip()
+    return json_loads(payload)
 
 class RAGAgent:
-    """Agent for running RAG and direct LLM pipelines."""
+    """Agent for running RAG and direct LLM pipelines.
+    
+    Each pipeline has a sync (run_*) and an async (arun_*) entry point. Both
+    share the prompt-building and response-parsing steps; only the LLM and
+    retrieval calls differ.
+    """
     
     def __init__(self, vectorstore=None):
         self.vectorstore = vectorstore
         self.llm = create_llm()
+        self.cache = QueryCache()
     
-    def run_rag(
+    def add_documents(self, chunks: list):
+        """Add chunks to the vector store and invalidate cached responses."""
+        add_documents_to_store(self.vectorstore, chunks)
+        self.cache.clear()
+    
+    def _cache_get(self, key: bytes, query: str, namespace: str):
+        """Look up a cached result, falling back to the semantic tier when enabled."""
+        cached = self.cache.get(key)
+        embedding = None
+        if cached is None and RESPONSE_CACHE_SEMANTIC and self.vectorstore:
+            try:
+                embedding = self.vectorstore.embeddings.embed_query(query)
+                cached = self.cache.get_similar(embedding, namespace)
+            except Exception as e:
+                logger.warning(f"Semantic cache lookup failed: {e}")
+        if cached is not None:
+            cached['query'] = query
+        return cached, embedding
+    
+    def _cache_put(self, key: bytes, result: Dict[str, Any], embedding, namespace: str):
+        """Cache results that parsed and passed schema validation only."""
+        if result['error'] is None and result['result'] is not None and result['valid_output']:
+            self.cache.put(key, result, embedding=embedding, namespace=namespace)
+    
+    def _start_rag(self, query: str, schema_type: str, use_rag: bool):
+        """Return (cache_key, namespace, cached_or_None, embedding, fresh result)."""
+        namespace = f"{schema_type}|{use_rag}"
+        cache_key = make_cache_key(schema_type, use_rag, query)
+        cached, embedding = self._cache_get(cache_key, query, namespace)
+        result = {
+            'query': query,
+            'schema_type': schema_type,
+            'mode': 'rag' if use_rag else 'direct',
+            'result': None,
+            'context_used': [],
+            'valid_output': False,
+            'latency_s': 0,
+            'error': None
+        }
+        return cache_key, namespace, cached, embedding, result
+    
+    async def _astart(self, start, *args):
+        """Run a _start_* step off the event loop when the semantic cache may embed."""
+        if RESPONSE_CACHE_SEMANTIC and self.vectorstore:
+            return await asyncio.to_thread(start, *args)
+        return start(*args)
+    
+    def _build_rag_prompt(
         self,
         query: str,
         schema_type: str,
-        use_rag: bool = True,
-        num_context: int = RETRIEVAL_TOP_K
-    ) -> Dict[str, Any]:
-        """Run RAG pipeline with context retrieval."""
-        start_time = time.time()
+        use_rag: bool,
+        context_docs: List[Dict[str, Any]],
+        result: Dict[str, Any]
+    ) -> str:
+        """Build the full prompt, recording context snippets on the result if enabled."""
+        if RAG_INCLUDE_CONTEXT_IN_RESULT:
+            result['context_used'] = [
+                {
+                    'content': doc['content'][:200],
+                    'source': doc['metadata'].get('source', 'unknown'),
+                    'score': doc['score']
+                }
+                for doc in context_docs
+            ]
+        
+        # Format context
+        context_text = "\n".join([doc['content'] for doc in context_docs])
+        
+        # Get the cached template split around its placeholders
+        prefix, between, suffix = split_prompt_template(schema_type)
+        
+        # Build full prompt; dynamic fields only follow the static prefix
+        context_section = f"CONTEXT:\n{context_text}" if use_rag and context_text else ""
+        return f"{prefix}{context_section}{between}QUERY: {query}{suffix}"
+    
+    def _start_direct(self, query: str, schema_type: str, input_data: Optional[Dict[str, Any]]):
+        """Return (cache_key, namespace, cached_or_None, embedding, fresh result, input JSON)."""
+        input_json = json.dumps(input_data or {'text': query})
+        namespace = f"{schema_type}|direct"
+        cache_key = make_cache_key(schema_type, 'direct', input_json)
+        cached, embedding = self._cache_get(cache_key, query, namespace)
         result = {
             'query': query,
             'schema_type': schema_type,
-            'mode': 'rag' if use_rag else 'direct',
+            'mode': 'direct',
             'result': None,
-            'context_used': [],
             'valid_output': False,
             'latency_s': 0,
             'error': None
         }
+        return cache_key, namespace, cached, embedding, result, input_json
+    
+    def _parse_response(
+        self,
+        response,
+        schema_type: str,
+        result: Dict[str, Any],
+        error_message: str
+    ):
+        """Parse the LLM response into result['result'] and validate it."""
+        response_text = response.content if hasattr(response, 'content') else str(response)
         
         try:
-            # Retrieve context
-            context_docs = []
-            if use_rag and self.vectorstore:
-                context_docs = retrieve_documents(self.vectorstore, query, k=num_context)
-                result['context_used'] = [
-                    {
-                        'content': doc['content'][:200],
-                        'source': doc['metadata'].get('source', 'unknown'),
-                        'score': doc['score']
-                    }
-                    for doc in context_docs
-                ]
-            
-            # Format context
-            context_text = "\n".join([doc['content'] for doc in context_docs])
-            
-            # Get prompt template
-            prompt_template = get_prompt_template(schema_type)
-            
-            # Build full prompt
-            if use_rag and context_text:
-                full_prompt = prompt_template.replace("{{context}}", context_text)
-                full_prompt += f"\n\nQUERY: {query}"
-            else:
-                full_prompt = prompt_template + f"\n\nQUERY: {query}"
+            result['result'] = _parse_json_response(response_text)
+            result['valid_output'] = validate_output(result['result'], schema_type)
+        except json.JSONDecodeError as e:
+            logger.warning(f"{error_message}: {response_text[:100]}")
+            result['error'] = _error_info(e, error_message)
+    
+    def _finish(
+        self,
+        result: Dict[str, Any],
+        start_time: float,
+        cache_key: bytes,
+        embedding,
+        namespace: str
+    ):
+        """Stamp latency on the result and cache it."""
+        result['latency_s'] = time.time() - start_time
+        self._cache_put(cache_key, result, embedding, namespace)
+        return result
+    
+    def run_rag(
+        self,
+        query: str,
+        schema_type: str,
+        use_rag: bool = True,
+        num_context: int = RETRIEVAL_TOP_K,
+        context_docs: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Run RAG pipeline with context retrieval.
+        
+        Pass context_docs to reuse documents already retrieved for this query
+        (e.g. by retrieve_documents_batch) instead of querying the store again.
+        """
+        start_time = time.time()
+        cache_key, namespace, cached, embedding, result = self._start_rag(
+            query, schema_type, use_rag
+        )
+        if cached is not None:
+            cached['latency_s'] = time.time() - start_time
+            return cached
+        
+        try:
+            if context_docs is None:
+                context_docs = []
+                if use_rag and self.vectorstore:
+                    context_docs = retrieve_documents(self.vectorstore, query, k=num_context)
+            full_prompt = self._build_rag_prompt(query, schema_type, use_rag, context_docs, result)
             
-            # Call LLM
             response = self.llm.invoke(full_prompt)
-            response_text = response.content if hasattr(response, 'content') else str(response)
+            self._parse_response(
+                response, schema_type, result, "Failed to parse JSON from LLM response"
+            )
+        
+        except Exception as e:
+            logger.error(f"Error in RAG pipeline: {e}")
+            result['error'] = _error_info(e)
+        
+        return self._finish(result, start_time, cache_key, embedding, namespace)
+    
+    async def arun_rag(
+        self,
+        query: str,
+        schema_type: str,
+        use_rag: bool = True,
+        num_context: int = RETRIEVAL_TOP_K,
+        context_docs: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Async variant of run_rag."""
+        start_time = time.time()
+        cache_key, namespace, cached, embedding, result = await self._astart(
+            self._start_rag, query, schema_type, use_rag
+        )
+        if cached is not None:
+            cached['latency_s'] = time.time() - start_time
+            return cached
+        
+        try:
+            if context_docs is None:
+                context_docs = []
+                if use_rag and self.vectorstore:
+                    context_docs = await aretrieve_documents(self.vectorstore, query, k=num_context)
+            full_prompt = self._build_rag_prompt(query, schema_type, use_rag, context_docs, result)
             
-            # Parse JSON output
-            try:
-                # Extract JSON from response
-                json_str = response_text.strip()
-                if json_str.startswith('```json'):
-                    json_str = json_str[7:-3]
-                elif json_str.startswith('```'):
-                    json_str = json_str[3:-3]
-                
-                result['result'] = json.loads(json_str)
-                result['valid_output'] = validate_output(result['result'], schema_type)
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to parse JSON from LLM response: {response_text[:100]}")
-                result['error'] = "Failed to parse JSON from LLM response"
+            response = await self.llm.ainvoke(full_prompt)
+            self._parse_response(
+                response, schema_type, result, "Failed to parse JSON from LLM response"
+            )
         
         except Exception as e:
             logger.error(f"Error in RAG pipeline: {e}")
-            result['error'] = str(e)
+            result['error'] = _error_info(e)
         
-        result['latency_s'] = time.time() - start_time
-        return result
+        return self._finish(result, start_time, cache_key, embedding, namespace)
     
     def run_direct(
         self,
@@ -97,52 +244,64 @@ class RAGAgent:
     ) -> Dict[str, Any]:
         """Run direct LLM without retrieval."""
         start_time = time.time()
-        result = {
-            'query': query,
-            'schema_type': schema_type,
-            'mode': 'direct',
-            'result': None,
-            'valid_output': False,
-            'latency_s': 0,
-            'error': None
-        }
+        cache_key, namespace, cached, embedding, result, input_json = self._start_direct(
+            query, schema_type, input_data
+        )
+        if cached is not None:
+            cached['latency_s'] = time.time() - start_time
+            return cached
         
         try:
-            prompt_template = get_prompt_template(schema_type)
-            full_prompt = prompt_template + f"\n\nINPUT: {json.dumps(input_data or {'text': query})}"
+            prefix, between, suffix = split_prompt_template(schema_type)
+            full_prompt = f"{prefix}{between}INPUT: {input_json}{suffix}"
             
             response = self.llm.invoke(full_prompt)
-            response_text = response.content if hasattr(response, 'content') else str(response)
+            self._parse_response(response, schema_type, result, "Failed to parse JSON")
+        
+        except Exception as e:
+            logger.error(f"Error in direct pipeline: {e}")
+            result['error'] = _error_info(e)
+        
+        return self._finish(result, start_time, cache_key, embedding, namespace)
+    
+    async def arun_direct(
+        self,
+        query: str,
+        schema_type: str,
+        input_data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Async variant of run_direct."""
+        start_time = time.time()
+        cache_key, namespace, cached, embedding, result, input_json = await self._astart(
+            self._start_direct, query, schema_type, input_data
+        )
+        if cached is not None:
+            cached['latency_s'] = time.time() - start_time
+            return cached
+        
+        try:
+            prefix, between, suffix = split_prompt_template(schema_type)
+            full_prompt = f"{prefix}{between}INPUT: {input_json}{suffix}"
             
-            try:
-                json_str = response_text.strip()
-                if json_str.startswith('```json'):
-                    json_str = json_str[7:-3]
-                elif json_str.startswith('```'):
-                    json_str = json_str[3:-3]
-                
-                result['result'] = json.loads(json_str)
-                result['valid_output'] = validate_output(result['result'], schema_type)
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to parse JSON: {response_text[:100]}")
-                result['error'] = "Failed to parse JSON"
+            response = await self.llm.ainvoke(full_prompt)
+            self._parse_response(response, schema_type, result, "Failed to parse JSON")
         
         except Exception as e:
             logger.error(f"Error in direct pipeline: {e}")
-            result['error'] = str(e)
+            result['error'] = _error_info(e)
         
-        result['latency_s'] = time.time() - start_time
-        return result
+        return self._finish(result, start_time, cache_key, embedding, namespace)
     
     def run_and_validate(
         self,
         query: str,
         schema_type: str,
-        use_rag: bool = True
+        use_rag: bool = True,
+        context_docs: Optional[List[Dict[str, Any]]] = None
     ) -> Dict[str, Any]:
         """Run pipeline and validate output."""
         if use_rag and self.vectorstore:
-            result = self.run_rag(query, schema_type, use_rag=True)
+            result = self.run_rag(query, schema_type, use_rag=True, context_docs=context_docs)
         else:
             result = self.run_direct(query, schema_type)
         
@@ -150,3 +309,23 @@ class RAGAgent:
             logger.warning(f"Output failed validation for schema {schema_type}")
         
         return result
+    
+    async def arun_and_validate(
+        self,
+        query: str,
+        schema_type: str,
+        use_rag: bool = True,
+        context_docs: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Async variant of run_and_validate."""
+        if use_rag and self.vectorstore:
+            result = await self.arun_rag(
+                query, schema_type, use_rag=True, context_docs=context_docs
+            )
+        else:
+            result = await self.arun_direct(query, schema_type)
+        
+        if not result['valid_output'] and result['result']:
+            logger.warning(f"Output failed validation for schema {schema_type}")
+        
+        return result
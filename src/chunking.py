@@ -1,9 +1,51 @@
+import numpy as np
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from src.config import CHUNK_SIZE, CHUNK_OVERLAP
+from src.config import CHUNK_SIZE, CHUNK_OVERLAP, CHUNKER
 from src.logging_config import logger
 
+def fast_chunk(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> list:
+    """Split text into windows of at most chunk_size characters with overlap.
+    
+    Each window ends at the last newline inside it that lies beyond the
+    overlap, or is cut hard at chunk_size if there is none, so every window
+    starts past the previous one's overlap. Newlines are located with a vectorized scan
+    over the UTF-32 code points, so offsets are character offsets.
+    """
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    newlines = np.flatnonzero(codes == 10)
+    
+    chunks = []
+    start, length = 0, len(text)
+    while start < length:
+        end = min(start + chunk_size, length)
+        if end < length:
+            j = np.searchsorted(newlines, end, side='right') - 1
+            if j >= 0 and newlines[j] > start + overlap:
+                end = int(newlines[j]) + 1
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= length:
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+class FastChunker:
+    """Splitter exposing split_text() on top of fast_chunk."""
+    def __init__(self, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+    
+    def split_text(self, text: str) -> list:
+        return fast_chunk(text, self.chunk_size, self.chunk_overlap)
+
+# Lazily built splitter shared by chunk_documents calls that don't pass one
+_DEFAULT_CHUNKER = None
+
 def create_chunker():
     """Create and return a text splitter with configured parameters."""
+    if CHUNKER == 'fast':
+        return FastChunker(CHUNK_SIZE, CHUNK_OVERLAP)
     return RecursiveCharacterTextSplitter(
         chunk_size=CHUNK_SIZE,
         chunk_overlap=CHUNK_OVERLAP,
@@ -12,8 +54,11 @@ def create_chunker():
 
 def chunk_documents(documents: list, splitter=None) -> list:
     """Chunk documents using recursive character splitter."""
+    global _DEFAULT_CHUNKER
     if splitter is None:
-        splitter = create_chunker()
+        if _DEFAULT_CHUNKER is None:
+            _DEFAULT_CHUNKER = create_chunker()
+        splitter = _DEFAULT_CHUNKER
     
     chunks = []
     for doc in documents:
@@ -8,6 +8,7 @@ load_dotenv()
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2")
 OLLAMA_EMBEDDING_MODEL = os.getenv("OLLAMA_EMBEDDING_MODEL", "gte-large")
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+OLLAMA_WARMUP = os.getenv("OLLAMA_WARMUP", "true").lower() == "true"
 
 # LLM Parameters
 LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", 0.3))
@@ -18,15 +19,31 @@ LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", 2048))
 # Chunking Configuration
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", 900))
 CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", 200))
+CHUNKER = os.getenv("CHUNKER", "langchain").lower()  # langchain | fast
 
 # Retrieval Configuration
 RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", 5))
 MIN_SIMILARITY_SCORE = float(os.getenv("MIN_SIMILARITY_SCORE", 0.3))
+RAG_INCLUDE_CONTEXT_IN_RESULT = (
+    os.getenv("RAG_INCLUDE_CONTEXT_IN_RESULT", "false").lower() == "true"
+)
+
+# Embedding
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 64))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "output/embedding_cache.db")
+EMBEDDING_QUANTIZATION = os.getenv("EMBEDDING_QUANTIZATION", "none").lower()  # none | fp16 | int8
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", 4))
 
 # Vector Store
 VECTOR_DB_PATH = os.getenv("VECTOR_DB_PATH", "output/chroma_db")
 VECTOR_DB_COLLECTION = os.getenv("VECTOR_DB_COLLECTION", "knowledge_base")
 
+# Response Cache
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 256))
+RESPONSE_CACHE_TTL_S = float(os.getenv("RESPONSE_CACHE_TTL_S", 3600))
+RESPONSE_CACHE_SEMANTIC = os.getenv("RESPONSE_CACHE_SEMANTIC", "false").lower() == "true"
+RESPONSE_CACHE_MIN_SIMILARITY = float(os.getenv("RESPONSE_CACHE_MIN_SIMILARITY", 0.95))
+
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FILE = os.getenv("LOG_FILE", "output/app.log")
@@ -35,11 +52,16 @@ LOG_FILE = os.getenv("LOG_FILE", "output/app.log")
 EVAL_METRICS = os.getenv("EVAL_METRICS", "schema_pass_rate,latency,retrieval_accuracy").split(",")
 BASELINE_MODEL = os.getenv("BASELINE_MODEL", "basic_template")
 
+# Batch Processing
+CSV_PARALLELISM = int(os.getenv("CSV_PARALLELISM", 8))
+
 # PII Detection
 ENABLE_PII_DETECTION = os.getenv("ENABLE_PII_DETECTION", "true").lower() == "true"
 REDACT_EMAIL = os.getenv("REDACT_EMAIL", "true").lower() == "true"
 REDACT_PHONE = os.getenv("REDACT_PHONE", "true").lower() == "true"
 REDACT_SSN = os.getenv("REDACT_SSN", "true").lower() == "true"
+# Redact PII from knowledge-base chunks during --index (opt-in)
+REDACT_KB_ON_INDEX = os.getenv("REDACT_KB_ON_INDEX", "false").lower() == "true"
 
 # Ensure output directories exist
 os.makedirs(os.path.dirname(VECTOR_DB_PATH), exist_ok=True)
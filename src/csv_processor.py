@@ -1,21 +1,35 @@
 ﻿import csv
-import json
 from typing import List, Dict, Any
+from src.io_utils import json_dumps
+
+TASK_COLUMNS = ('task_id', 'task_type', 'input_text')
+
+def _cell(row: List[str], i):
+    '''Return row[i], or None if the column is absent or the row is short.'''
+    return row[i] if i is not None and i < len(row) else None
 
 def load_csv_tasks(csv_path: str) -> List[Dict[str, Any]]:
     '''Load tasks from CSV file.'''
     tasks = []
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
+    # utf-8-sig drops the BOM that would otherwise be glued to the first header
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return tasks
+        # Resolve column positions once instead of building a dict per row
+        idx = {name: i for i, name in enumerate(header)}
+        id_i, type_i, input_i = (idx.get(name) for name in TASK_COLUMNS)
+        meta_idx = [(name, i) for name, i in idx.items() if name not in TASK_COLUMNS]
         for row in reader:
-            task = {
-                'task_id': row.get('task_id'),
-                'task_type': row.get('task_type'),
-                'input': row.get('input_text'),
-                'metadata': {k: v for k, v in row.items() 
-                           if k not in ['task_id', 'task_type', 'input_text']}
-            }
-            tasks.append(task)
+            if not row:
+                continue
+            tasks.append({
+                'task_id': _cell(row, id_i),
+                'task_type': _cell(row, type_i),
+                'input': _cell(row, input_i),
+                'metadata': {name: _cell(row, i) for name, i in meta_idx}
+            })
     return tasks
 
 def save_results_csv(results: List[Dict[str, Any]], output_path: str):
@@ -29,7 +43,7 @@ def save_results_csv(results: List[Dict[str, Any]], output_path: str):
         for r in results:
             writer.writerow({
                 'task_id': r['task_id'],
-                'task_type': r['task_type'],
-                'result_json': json.dumps(r['result']),
+                'task_type': r.get('task_type', r.get('schema_type')),
+                'result_json': json_dumps(r['result']),
                 'latency_s': r.get('latency_s', 0)
             })
@@ -1,7 +1,11 @@
+import io
 import json
 import csv
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import pdfplumber
 from src.logging_config import logger
 
@@ -17,12 +21,10 @@ def load_json(file_path: str) -> List[Dict[str, Any]]:
 def load_csv(file_path: str) -> List[Dict[str, Any]]:
     """Load data from CSV file."""
     try:
-        rows = []
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                rows.append(row)
-        return rows
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            return [dict(zip(header, row)) for row in reader if row]
     except Exception as e:
         logger.error(f"Error loading CSV from {file_path}: {e}")
         return []
@@ -39,47 +41,74 @@ def load_txt(file_path: str) -> str:
 def load_pdf(file_path: str) -> str:
     """Load data from PDF file."""
     try:
-        text = ""
         with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() + "\n"
-        return text
+            # extract_text() returns None for pages without a text layer
+            parts = [page.extract_text() or "" for page in pdf.pages]
+        return "\n".join(parts)
     except Exception as e:
         logger.error(f"Error loading PDF from {file_path}: {e}")
         return ""
 
+KB_SUFFIXES = {'.pdf', '.txt', '.json', '.csv'}
+
+def _rows_to_text(rows) -> str:
+    """Flatten records into one "key: value | key: value" line per record."""
+    if isinstance(rows, dict):
+        rows = [rows]
+    buf = io.StringIO()
+    for row in rows:
+        if isinstance(row, dict):
+            buf.write(" | ".join(f"{k}: {v}" for k, v in row.items()))
+        else:
+            buf.write(row if isinstance(row, str) else json.dumps(row))
+        buf.write("\n")
+    return buf.getvalue()
+
+def _load_kb_file(file_path: Path, doc_id: str) -> Optional[Dict[str, str]]:
+    """Load a single KB file into a document dict, or None if it is empty."""
+    start_time = time.perf_counter()
+    
+    if file_path.suffix == '.pdf':
+        content = load_pdf(str(file_path))
+    elif file_path.suffix == '.txt':
+        content = load_txt(str(file_path))
+    elif file_path.suffix == '.json':
+        content = _rows_to_text(load_json(str(file_path)))
+    else:
+        content = _rows_to_text(load_csv(str(file_path)))
+    
+    logger.debug(f"Loaded {file_path} in {time.perf_counter() - start_time:.3f}s")
+    if not content:
+        return None
+    return {
+        'id': doc_id,
+        'source': str(file_path),
+        'content': content
+    }
+
 def load_kb_directory(kb_dir: str) -> List[Dict[str, str]]:
     """Load all knowledge base files from directory."""
-    documents = []
     kb_path = Path(kb_dir)
     
     if not kb_path.exists():
         logger.warning(f"KB directory does not exist: {kb_dir}")
-        return documents
+        return []
+    
+    file_paths = [p for p in kb_path.glob('**/*') if p.suffix in KB_SUFFIXES and p.is_file()]
+    # Ids stay the file stem so existing chunk ids are stable; when files share a
+    # stem (e.g. kb.csv and kb.txt), the first in sorted path order keeps it and
+    # the others use their relative path
+    first_for_stem = {}
+    for p in sorted(file_paths):
+        first_for_stem.setdefault(p.stem, p)
+    doc_ids = [
+        p.stem if first_for_stem[p.stem] == p else p.relative_to(kb_path).as_posix()
+        for p in file_paths
+    ]
     
-    for file_path in kb_path.glob('**/*'):
-        if file_path.is_file():
-            doc_id = file_path.stem
-            
-            if file_path.suffix == '.pdf':
-                content = load_pdf(str(file_path))
-            elif file_path.suffix == '.txt':
-                content = load_txt(str(file_path))
-            elif file_path.suffix == '.json':
-                data = load_json(str(file_path))
-                content = json.dumps(data)
-            elif file_path.suffix == '.csv':
-                data = load_csv(str(file_path))
-                content = json.dumps(data)
-            else:
-                continue
-            
-            if content:
-                documents.append({
-                    'id': doc_id,
-                    'source': str(file_path),
-                    'content': content
-                })
+    # Files are independent; load them concurrently. map() keeps glob order.
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as executor:
+        documents = [doc for doc in executor.map(_load_kb_file, file_paths, doc_ids) if doc]
     
     logger.info(f"Loaded {len(documents)} documents from {kb_dir}")
     return documents
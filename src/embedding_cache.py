@@ -0,0 +1,105 @@
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+from src.config import EMBEDDING_CACHE_PATH, OLLAMA_EMBEDDING_MODEL, EMBEDDING_QUANTIZATION
+from src.embeddings import quantize_int8, dequantize_int8
+from src.logging_config import logger
+
+# SQLite caps the number of bound parameters per statement
+_LOOKUP_BATCH = 500
+
+def content_hash(text: str) -> bytes:
+    """Return the SHA-256 digest used as the cache key for a text."""
+    return hashlib.sha256(text.encode('utf-8')).digest()
+
+def _encode(vec: np.ndarray, quantization: str) -> bytes:
+    if quantization == 'int8':
+        q_vec, scale = quantize_int8(vec)
+        return np.float32(scale).tobytes() + q_vec.tobytes()
+    if quantization == 'fp16':
+        return vec.astype(np.float16).tobytes()
+    return vec.tobytes()
+
+def _decode(blob: bytes, quantization: str) -> np.ndarray:
+    if quantization == 'int8':
+        scale = np.frombuffer(blob[:4], dtype=np.float32)[0]
+        return dequantize_int8(np.frombuffer(blob[4:], dtype=np.int8), scale)
+    if quantization == 'fp16':
+        return np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+    return np.frombuffer(blob, dtype=np.float32)
+
+class EmbeddingCache:
+    """Persistent cache of embedding vectors keyed by content hash and model.
+    
+    Vectors are stored as float32 bytes by default, so unchanged chunks are
+    never re-embedded across --index runs. With quantization 'fp16' or 'int8'
+    (scale + int8 codes) the stored vectors are 2x / 4x smaller; the
+    quantization is appended to the model key so formats never mix.
+    """
+    
+    def __init__(
+        self,
+        path: str = EMBEDDING_CACHE_PATH,
+        model: str = OLLAMA_EMBEDDING_MODEL,
+        quantization: str = EMBEDDING_QUANTIZATION
+    ):
+        self.path = path
+        self.quantization = quantization if quantization in ('fp16', 'int8') else 'none'
+        self.model = model if self.quantization == 'none' else f"{model}:{self.quantization}"
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "sha256 BLOB NOT NULL, model TEXT NOT NULL, dim INTEGER NOT NULL, vec BLOB NOT NULL, "
+            "PRIMARY KEY (sha256, model))"
+        )
+        self._conn.commit()
+    
+    def get_many(self, texts: List[str]) -> Dict[str, List[float]]:
+        """Return cached vectors for whichever of texts are present."""
+        by_hash = {content_hash(text): text for text in texts}
+        hashes = list(by_hash)
+        found = {}
+        for i in range(0, len(hashes), _LOOKUP_BATCH):
+            batch = hashes[i:i + _LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                "SELECT sha256, vec FROM embeddings "
+                f"WHERE model = ? AND sha256 IN ({placeholders})",
+                [self.model, *batch]
+            )
+            for digest, vec in rows:
+                found[by_hash[digest]] = _decode(vec, self.quantization).tolist()
+        return found
+    
+    def put_many(self, texts: List[str], vectors: List[List[float]]) -> List[List[float]]:
+        """Store vectors for texts, replacing existing entries.
+        
+        Returns the vectors as get_many will return them (after the float32 /
+        fp16 / int8 round trip), so callers can index exactly what a later
+        cache hit would give them.
+        """
+        rows = []
+        stored = []
+        for text, vector in zip(texts, vectors):
+            vec = np.asarray(vector, dtype=np.float32)
+            blob = _encode(vec, self.quantization)
+            rows.append((content_hash(text), self.model, vec.shape[0], blob))
+            stored.append(_decode(blob, self.quantization).tolist())
+        self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+        self._conn.commit()
+        return stored
+    
+    def clear(self) -> None:
+        """Drop all cached vectors for this model."""
+        deleted = self._conn.execute(
+            "DELETE FROM embeddings WHERE model = ?", (self.model,)
+        ).rowcount
+        self._conn.commit()
+        logger.info(f"Cleared {deleted} cached embeddings for {self.model}")
+    
+    def close(self) -> None:
+        self._conn.close()
@@ -1,16 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 from langchain_community.embeddings import OllamaEmbeddings
-from src.config import OLLAMA_BASE_URL, OLLAMA_EMBEDDING_MODEL
+from langchain_community.embeddings import ollama as ollama_embeddings_module
+from src.http_session import install_session
+from src.config import (
+    OLLAMA_BASE_URL, OLLAMA_EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE, EMBEDDING_WORKERS, OLLAMA_WARMUP
+)
 from src.logging_config import logger
 
 def create_embeddings():
     """Create and return Ollama embeddings model."""
     try:
+        install_session(ollama_embeddings_module)
         embeddings = OllamaEmbeddings(
             base_url=OLLAMA_BASE_URL,
             model=OLLAMA_EMBEDDING_MODEL
         )
         logger.info(f"Initialized Ollama embeddings: {OLLAMA_EMBEDDING_MODEL}")
-        return embeddings
     except Exception as e:
         logger.error(f"Failed to initialize embeddings: {e}")
         raise
+    
+    if OLLAMA_WARMUP:
+        # Load the model into Ollama before the first real request
+        try:
+            embeddings.embed_query("warmup")
+        except Exception as e:
+            logger.warning(f"Embedding warm-up failed: {e}")
+    return embeddings
+
+def quantize_int8(vec) -> tuple:
+    """Quantize a vector to int8 with a symmetric per-vector scale.
+    
+    Returns (int8 array, float32 scale); dequantize_int8 reverses it.
+    """
+    vec = np.asarray(vec, dtype=np.float32)
+    max_abs = float(np.abs(vec).max()) if vec.size else 0.0
+    scale = np.float32(max_abs / 127.0 if max_abs else 1.0)
+    return np.round(vec / scale).astype(np.int8), scale
+
+def dequantize_int8(q_vec, scale) -> np.ndarray:
+    """Recover an approximate float32 vector from quantize_int8 output."""
+    return np.asarray(q_vec, dtype=np.float32) * np.float32(scale)
+
+def embed_texts_batched(embeddings, texts: list, batch_size: int = EMBEDDING_BATCH_SIZE,
+                        cache=None) -> list:
+    """Embed texts in batches, embedding each distinct text only once.
+    
+    If an EmbeddingCache is given, only texts missing from it are sent to the
+    model and the new vectors are written back. Embedding requests for
+    different batches run on up to EMBEDDING_WORKERS threads; cache writes
+    stay on the calling thread, which owns the SQLite connection.
+    """
+    unique_texts = list(dict.fromkeys(texts))
+    vectors = cache.get_many(unique_texts) if cache is not None else {}
+    missing = [text for text in unique_texts if text not in vectors]
+    batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+    
+    with ThreadPoolExecutor(max_workers=max(min(EMBEDDING_WORKERS, len(batches)), 1)) as executor:
+        for batch, batch_vectors in zip(batches, executor.map(embeddings.embed_documents, batches)):
+            if cache is not None:
+                # Use the cached form so reruns that hit the cache index identical vectors
+                batch_vectors = cache.put_many(batch, batch_vectors)
+            vectors.update(zip(batch, batch_vectors))
+    
+    logger.info(
+        f"Embedded {len(missing)} texts in batches of {batch_size} "
+        f"({len(unique_texts) - len(missing)} cached, {len(texts)} total)"
+    )
+    return [vectors[text] for text in texts]
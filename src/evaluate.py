@@ -1,30 +1,34 @@
 import json
-from pathlib import Path
+from datetime import datetime
 from typing import List, Dict, Any
 from src.metrics_report import generate_metrics_report, generate_json_metrics
 from src.logging_config import logger
+from src.io_utils import ensure_dir
 
 def run_evaluation(results_path: str, output_dir: str = 'output'):
     """Run evaluation on results file."""
     
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    ensure_dir(output_dir)
     
     try:
-        with open(results_path, 'r') as f:
+        with open(results_path, 'r', encoding='utf-8') as f:
             results = json.load(f)
     except Exception as e:
         logger.error(f"Failed to load results: {e}")
         return
     
-    # Generate reports
+    # Generate reports, both stamped with the same time
+    now = datetime.now()
     markdown_report = generate_metrics_report(
         results,
-        output_path=f'{output_dir}/metrics_report.md'
+        output_path=f'{output_dir}/metrics_report.md',
+        now=now
     )
     
     json_metrics = generate_json_metrics(
         results,
-        output_path=f'{output_dir}/metrics.json'
+        output_path=f'{output_dir}/metrics.json',
+        now=now
     )
     
     logger.info(f"Evaluation complete. Reports saved to {output_dir}")
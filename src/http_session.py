@@ -0,0 +1,78 @@
+"""Pooled keep-alive HTTP sessions shared by the Ollama clients.
+
+The langchain-community Ollama wrappers call requests.post() directly and
+take no session argument, so install_session() points the `requests` name
+inside their modules at a proxy whose post() goes through the shared pool.
+Their async paths open a new aiohttp.ClientSession() per call; the `aiohttp`
+name is likewise pointed at a proxy that hands out one pooled session per
+event loop instead.
+"""
+import asyncio
+import weakref
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_SIZE = 32
+
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+_SESSION.mount("http://", _adapter)
+_SESSION.mount("https://", _adapter)
+
+class _PooledRequests:
+    """Stand-in for the requests module that routes post() through the shared session."""
+    post = staticmethod(_SESSION.post)
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+# aiohttp sessions are bound to the loop they were created on
+_ASYNC_SESSIONS = weakref.WeakKeyDictionary()
+
+class _SharedSessionContext:
+    """`async with` target that yields the loop's pooled session without closing it."""
+    async def __aenter__(self):
+        return get_async_session()
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+class _PooledAiohttp:
+    """Stand-in for the aiohttp module whose ClientSession() reuses the loop's pooled session."""
+    @staticmethod
+    def ClientSession(*args, **kwargs):
+        if args or kwargs:
+            return aiohttp.ClientSession(*args, **kwargs)
+        return _SharedSessionContext()
+
+    def __getattr__(self, name):
+        return getattr(aiohttp, name)
+
+def get_session() -> requests.Session:
+    """Return the shared pooled session."""
+    return _SESSION
+
+def get_async_session() -> aiohttp.ClientSession:
+    """Return the pooled aiohttp session for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    session = _ASYNC_SESSIONS.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=POOL_SIZE))
+        _ASYNC_SESSIONS[loop] = session
+    return session
+
+async def close_async_session() -> None:
+    """Close the running loop's pooled session; call before the loop shuts down."""
+    session = _ASYNC_SESSIONS.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+def install_session(*modules) -> None:
+    """Route requests.post() and aiohttp.ClientSession() in modules to the shared pools."""
+    for module in modules:
+        if not isinstance(getattr(module, 'requests', None), _PooledRequests):
+            module.requests = _PooledRequests()
+        if hasattr(module, 'aiohttp') and not isinstance(module.aiohttp, _PooledAiohttp):
+            module.aiohttp = _PooledAiohttp()
@@ -0,0 +1,60 @@
+"""I/O helpers shared across the pipeline.
+
+JSON goes through orjson when it is installed and falls back to the
+stdlib json module otherwise.
+"""
+import json
+import os
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_loads(data):
+    """Parse JSON from a str or bytes payload."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj) -> str:
+    """Serialize obj to a compact JSON string."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj)
+
+# Directories already created by ensure_dir in this process
+_ENSURED_DIRS = set()
+
+def ensure_dir(path) -> None:
+    """Create directory path (with parents) once per process; repeat calls skip the mkdir."""
+    key = os.fspath(path)
+    if key not in _ENSURED_DIRS:
+        Path(key).mkdir(parents=True, exist_ok=True)
+        _ENSURED_DIRS.add(key)
+
+def write_text(path: str, text: str) -> None:
+    """Write text to path as UTF-8 with raw os.write calls, bypassing Python's buffered I/O."""
+    data = memoryview(text.encode('utf-8'))
+    # O_BINARY (Windows only) stops the C runtime from translating newlines
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
+        # os.write may write fewer bytes than requested
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+def write_json(path: str, obj, indent: bool = True) -> None:
+    """Write obj to path as JSON, indented by two spaces unless indent is False.
+    
+    Output is UTF-8; orjson writes non-ASCII characters raw rather than as
+    \\u escapes, so readers must open the file with encoding='utf-8'.
+    """
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, indent=2 if indent else None)
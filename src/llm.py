@@ -1,10 +1,14 @@
 from langchain_community.chat_models import ChatOllama
+from langchain_community.llms import ollama as ollama_llm_module
+from src.http_session import install_session
 from src.config import OLLAMA_BASE_URL, OLLAMA_MODEL, LLM_TEMPERATURE, LLM_MAX_TOKENS
 from src.logging_config import logger
 
 def create_llm():
     """Create and return ChatOllama LLM instance."""
     try:
+        # ChatOllama issues its HTTP calls from the llms.ollama module
+        install_session(ollama_llm_module)
         llm = ChatOllama(
             base_url=OLLAMA_BASE_URL,
             model=OLLAMA_MODEL,
@@ -1,18 +1,62 @@
-import json
+import asyncio
 import argparse
 from pathlib import Path
 from src.data_loader import load_json, load_kb_directory
 from src.chunking import chunk_documents
-from src.vectorstore import create_vector_store, add_documents_to_store
+from src.security import redact_pii_many
+from src.embeddings import embed_texts_batched
+from src.embedding_cache import EmbeddingCache
+from src.vectorstore import create_vector_store, add_documents_to_store, retrieve_documents_batch
 from src.agent import RAGAgent
 from src.csv_processor import load_csv_tasks, save_results_csv
 from src.logging_config import logger
-from src.config import VECTOR_DB_PATH
+from src.io_utils import write_json
+from src.http_session import close_async_session
+from src.config import VECTOR_DB_PATH, CSV_PARALLELISM, RETRIEVAL_TOP_K, REDACT_KB_ON_INDEX
+
+async def process_tasks(agent, tasks: list, default_schema: str, use_rag: bool) -> list:
+    """Run CSV tasks concurrently, at most CSV_PARALLELISM at a time, preserving input order.
+    
+    Rows with the same (task_type, input) run through the pipeline once and
+    share the result. With RAG, context for all distinct queries is retrieved
+    up front in one batched vector store query.
+    """
+    semaphore = asyncio.Semaphore(CSV_PARALLELISM)
+    keys = [(task.get('task_type', default_schema), task.get('input')) for task in tasks]
+    unique_keys = list(dict.fromkeys(keys))
+    
+    contexts = {}
+    if use_rag and agent.vectorstore:
+        queries = list(dict.fromkeys(query for _, query in unique_keys if query))
+        context_lists = await asyncio.to_thread(
+            retrieve_documents_batch, agent.vectorstore, queries, RETRIEVAL_TOP_K)
+        contexts = dict(zip(queries, context_lists))
+    
+    async def _process_key(key):
+        schema, query = key
+        async with semaphore:
+            return await agent.arun_and_validate(
+                query, schema, use_rag=use_rag, context_docs=contexts.get(query))
+    
+    try:
+        unique_results = await asyncio.gather(*(_process_key(key) for key in unique_keys))
+    finally:
+        # The pooled aiohttp session belongs to this event loop
+        await close_async_session()
+    if len(unique_keys) < len(keys):
+        logger.info(f"Deduplicated {len(keys)} tasks to {len(unique_keys)} unique queries")
+    
+    results_by_key = dict(zip(unique_keys, unique_results))
+    return [
+        {**results_by_key[key], 'task_id': task.get('task_id')} for key, task in zip(keys, tasks)
+    ]
 
 def main():
     parser = argparse.ArgumentParser(description="RAG-based hackathon solution runner")
     parser.add_argument('--index', action='store_true', help='Index knowledge base')
     parser.add_argument('--kb-dir', type=str, default='data/kb', help='Knowledge base directory')
+    parser.add_argument('--rebuild-embeddings', action='store_true',
+                        help='Ignore cached embeddings when indexing')
     parser.add_argument('--process', type=str, help='Process single JSON task')
     parser.add_argument('--process-csv', type=str, help='Process CSV batch tasks')
     parser.add_argument('--schema', type=str, default='generic_extraction', help='Schema type')
@@ -28,8 +72,21 @@ def main():
         documents = load_kb_directory(args.kb_dir)
         chunks = chunk_documents(documents)
         
+        # Opt-in: redact PII before it is embedded or stored
+        if REDACT_KB_ON_INDEX:
+            redacted = redact_pii_many([chunk['content'] for chunk in chunks])
+            for chunk, content in zip(chunks, redacted):
+                chunk['content'] = content
+        
         vectorstore = create_vector_store()
-        add_documents_to_store(vectorstore, chunks)
+        embedding_cache = EmbeddingCache()
+        if args.rebuild_embeddings:
+            embedding_cache.clear()
+        vectors = embed_texts_batched(
+            vectorstore.embeddings, [chunk['content'] for chunk in chunks], cache=embedding_cache
+        )
+        embedding_cache.close()
+        add_documents_to_store(vectorstore, chunks, vectors=vectors)
         
         logger.info(f"Successfully indexed {len(chunks)} chunks")
         return
@@ -55,13 +112,8 @@ def main():
     if args.process_csv:
         logger.info(f"Processing CSV batch from {args.process_csv}")
         tasks = load_csv_tasks(args.process_csv)
-        
-        for task in tasks:
-            query = task.get('input_text')
-            schema = task.get('task_type', args.schema)
-            result = agent.run_and_validate(query, schema, use_rag=not args.no_rag)
-            result['task_id'] = task.get('task_id')
-            results.append(result)
+        results.extend(asyncio.run(
+            process_tasks(agent, tasks, args.schema, use_rag=not args.no_rag)))
         
         # Save results as CSV
         output_path = args.output if args.output.endswith('.csv') else args.output.replace('.json', '.csv')
@@ -80,8 +132,7 @@ def main():
         output_dir = Path(args.output).parent
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        with open(args.output, 'w') as f:
-            json.dump(results, f, indent=2)
+        write_json(args.output, results)
         
         logger.info(f"Saved results to {args.output}")
         
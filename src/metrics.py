@@ -1,4 +1,8 @@
 import json
+import operator
+import sys
+from collections import Counter
+from itertools import compress
 from typing import List, Dict, Any
 from sklearn.metrics import precision_recall_fscore_support, confusion_matrix
 from rouge_score import rouge_scorer
@@ -14,29 +18,35 @@ def schema_pass_rate(results: List[Dict[str, Any]]) -> float:
 
 def latency_stats(results: List[Dict[str, Any]]) -> Dict[str, float]:
     """Calculate latency statistics."""
-    latencies = [r.get('latency_s', 0) for r in results]
-    if not latencies:
+    if not results:
         return {'min': 0, 'max': 0, 'mean': 0, 'median': 0}
     
+    # Convert once; each np.* call on a list would re-convert it
+    latencies = np.fromiter((r.get('latency_s', 0) for r in results), dtype=np.float64,
+                            count=len(results))
     return {
-        'min': float(np.min(latencies)),
-        'max': float(np.max(latencies)),
-        'mean': float(np.mean(latencies)),
+        'min': float(latencies.min()),
+        'max': float(latencies.max()),
+        'mean': float(latencies.mean()),
         'median': float(np.median(latencies))
     }
 
+def _error_type(error) -> str:
+    """Return the exception class name recorded for an error."""
+    if isinstance(error, dict):
+        return error.get('type', 'unknown')
+    # Results saved before errors were recorded as {'type', 'msg'} hold plain strings
+    return type(error).__name__
+
 def error_analysis(results: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Analyze errors in results."""
-    errors = {}
-    for r in results:
-        if r.get('error'):
-            error_type = type(r['error']).__name__
-            errors[error_type] = errors.get(error_type, 0) + 1
+    errors = Counter(_error_type(r['error']) for r in results if r.get('error'))
+    total = sum(errors.values())
     
     return {
-        'total_errors': sum(errors.values()),
-        'error_breakdown': errors,
-        'error_rate': (sum(errors.values()) / len(results)) * 100 if results else 0
+        'total_errors': total,
+        'error_breakdown': dict(errors),
+        'error_rate': (total / len(results)) * 100 if results else 0
     }
 
 def classification_metrics(
@@ -60,36 +70,44 @@ def classification_metrics(
 
 def qna_metrics(predictions: List[str], ground_truth: List[str]) -> Dict[str, float]:
     """Calculate Q&A metrics using ROUGE."""
-    scorer = rouge_scorer.RougeScorer(['rouge1', 'rougeL'], use_stemmer=True)
-    
-    scores = {'rouge1': [], 'rougeL': []}
-    for pred, gt in zip(predictions, ground_truth):
-        score = scorer.score(gt, pred)
-        scores['rouge1'].append(score['rouge1'].fmeasure)
-        scores['rougeL'].append(score['rougeL'].fmeasure)
+    from src.rouge_numba import NUMBA_AVAILABLE, rouge_fmeasures
+    if NUMBA_AVAILABLE:
+        scores = rouge_fmeasures(ground_truth, predictions, ['rouge1', 'rougeL'])
+    else:
+        scorer = rouge_scorer.RougeScorer(['rouge1', 'rougeL'], use_stemmer=True)
+        n = min(len(predictions), len(ground_truth))
+        scores = {'rouge1': np.empty(n), 'rougeL': np.empty(n)}
+        for i, (pred, gt) in enumerate(zip(predictions, ground_truth)):
+            score = scorer.score(gt, pred)
+            scores['rouge1'][i] = score['rouge1'].fmeasure
+            scores['rougeL'][i] = score['rougeL'].fmeasure
     
     return {
-        'rouge1_mean': float(np.mean(scores['rouge1'])),
-        'rougeL_mean': float(np.mean(scores['rougeL'])),
-        'rouge1_scores': scores['rouge1'],
-        'rougeL_scores': scores['rougeL']
+        'rouge1_mean': float(scores['rouge1'].mean()),
+        'rougeL_mean': float(scores['rougeL'].mean()),
+        'rouge1_scores': scores['rouge1'].tolist(),
+        'rougeL_scores': scores['rougeL'].tolist()
     }
 
 def summarization_metrics(summaries: List[str], references: List[str]) -> Dict[str, float]:
     """Calculate summarization metrics."""
-    scorer = rouge_scorer.RougeScorer(['rouge1', 'rouge2', 'rougeL'], use_stemmer=True)
-    
-    all_scores = {'rouge1': [], 'rouge2': [], 'rougeL': []}
-    for summary, reference in zip(summaries, references):
-        score = scorer.score(reference, summary)
-        all_scores['rouge1'].append(score['rouge1'].fmeasure)
-        all_scores['rouge2'].append(score['rouge2'].fmeasure)
-        all_scores['rougeL'].append(score['rougeL'].fmeasure)
+    from src.rouge_numba import NUMBA_AVAILABLE, rouge_fmeasures
+    if NUMBA_AVAILABLE:
+        all_scores = rouge_fmeasures(references, summaries, ['rouge1', 'rouge2', 'rougeL'])
+    else:
+        scorer = rouge_scorer.RougeScorer(['rouge1', 'rouge2', 'rougeL'], use_stemmer=True)
+        n = min(len(summaries), len(references))
+        all_scores = {'rouge1': np.empty(n), 'rouge2': np.empty(n), 'rougeL': np.empty(n)}
+        for i, (summary, reference) in enumerate(zip(summaries, references)):
+            score = scorer.score(reference, summary)
+            all_scores['rouge1'][i] = score['rouge1'].fmeasure
+            all_scores['rouge2'][i] = score['rouge2'].fmeasure
+            all_scores['rougeL'][i] = score['rougeL'].fmeasure
     
     return {
-        'rouge1': float(np.mean(all_scores['rouge1'])),
-        'rouge2': float(np.mean(all_scores['rouge2'])),
-        'rougeL': float(np.mean(all_scores['rougeL'])),
+        'rouge1': float(all_scores['rouge1'].mean()),
+        'rouge2': float(all_scores['rouge2'].mean()),
+        'rougeL': float(all_scores['rougeL'].mean()),
         'summary_lengths': [len(s.split()) for s in summaries],
         'reference_lengths': [len(r.split()) for r in references]
     }
@@ -139,3 +157,122 @@ def confidence_distribution(results: List[Dict[str, Any]]) -> Dict[str, float]:
         'medium': (confidences['medium'] / total) * 100,
         'low': (confidences['low'] / total) * 100
     }
+
+# Below this many values, NumPy call overhead outweighs vectorizing the stats
+_VECTORIZE_MIN = 64
+
+_UNKNOWN = sys.intern('unknown')
+_GET_SCHEMA = operator.itemgetter('schema_type')
+
+def _schema_types(results: List[Dict[str, Any]]) -> List[str]:
+    """Schema type per result, 'unknown' where missing."""
+    try:
+        # Fast path: rows written by the agent always carry schema_type
+        return list(map(_GET_SCHEMA, results))
+    except KeyError:
+        return [r.get('schema_type', _UNKNOWN) for r in results]
+
+# Integer codes for confidence/coverage levels; 3 = any other value
+_LEVELS = ('high', 'medium', 'low')
+_LEVEL_CODES = {level: code for code, level in enumerate(_LEVELS)}
+
+def _level_counts(codes: List[int]) -> List[int]:
+    """Count level codes 0-3, with np.bincount for large inputs."""
+    if len(codes) >= _VECTORIZE_MIN:
+        return np.bincount(np.asarray(codes, dtype=np.int8), minlength=4).tolist()
+    counts = [0, 0, 0, 0]
+    for code in codes:
+        counts[code] += 1
+    return counts
+
+def _latency_summary(latencies: List[float]) -> Dict[str, float]:
+    """Min/max/mean/median of latencies, in NumPy for large inputs."""
+    n = len(latencies)
+    if not n:
+        return {'min': 0, 'max': 0, 'mean': 0, 'median': 0}
+    if n >= _VECTORIZE_MIN:
+        values = np.asarray(latencies, dtype=np.float64)
+        return {
+            'min': float(values.min()),
+            'max': float(values.max()),
+            'mean': float(values.mean()),
+            'median': float(np.median(values))
+        }
+    ordered = sorted(latencies)
+    mid = n // 2
+    median = ordered[mid] if n % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+    return {
+        'min': float(ordered[0]),
+        'max': float(ordered[-1]),
+        'mean': float(sum(ordered) / n),
+        'median': float(median)
+    }
+
+def compute_all_metrics(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Compute all report metrics in a single pass over results.
+    
+    Returns the values of schema_pass_rate, latency_stats, error_analysis,
+    rag_retrieval_metrics and confidence_distribution under the keys used by
+    metrics.json, plus per-schema {'total', 'valid'} counts.
+    """
+    total = len(results)
+    
+    # Project the per-schema columns once (structure of arrays) and count them in C
+    types = _schema_types(results)
+    valid_flags = [bool(r.get('valid_output')) for r in results]
+    schema_totals = Counter(types)
+    schema_valid = Counter(compress(types, valid_flags))
+    valid = sum(valid_flags)
+    
+    latencies = []
+    errors = Counter()
+    confidence_codes = []
+    coverage_codes = []
+    rag_total = 0
+    
+    for r in results:
+        latencies.append(r.get('latency_s', 0))
+        if r.get('error'):
+            errors[_error_type(r['error'])] += 1
+        
+        is_rag = r.get('mode') == 'rag'
+        rag_total += is_rag
+        output = r.get('result')
+        if output:
+            confidence_codes.append(_LEVEL_CODES.get(output.get('confidence', 'low'), 3))
+            if is_rag:
+                coverage_codes.append(_LEVEL_CODES.get(output.get('context_coverage', 'low'), 3))
+    
+    rag_metrics = {}
+    if rag_total:
+        coverage = _level_counts(coverage_codes)
+        rag_metrics = {
+            'total_rag_queries': rag_total,
+            'context_coverage_high_pct': coverage[0] / rag_total * 100,
+            'context_coverage_medium_pct': coverage[1] / rag_total * 100,
+            'context_coverage_low_pct': coverage[2] / rag_total * 100,
+        }
+    
+    confidences = _level_counts(confidence_codes)[:3]
+    conf_total = sum(confidences)
+    total_errors = sum(errors.values())
+    
+    return {
+        'total_queries': total,
+        'schema_pass_rate': (valid / total) * 100 if total else 0.0,
+        'latency_stats': _latency_summary(latencies),
+        'error_analysis': {
+            'total_errors': total_errors,
+            'error_breakdown': dict(errors),
+            'error_rate': (total_errors / total) * 100 if total else 0
+        },
+        'rag_metrics': rag_metrics,
+        'confidence_distribution': {
+            level: (count / conf_total) * 100 if conf_total else 0
+            for level, count in zip(_LEVELS, confidences)
+        },
+        'schema_breakdown': {
+            schema: {'total': count, 'valid': schema_valid[schema]}
+            for schema, count in schema_totals.items()
+        }
+    }
@@ -1,32 +1,39 @@
-import json
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
-from src.metrics import (
-    schema_pass_rate, latency_stats, error_analysis,
-    rag_retrieval_metrics, confidence_distribution
-)
+from typing import List, Dict, Any, Optional
+from src.metrics import compute_all_metrics
+from src.io_utils import ensure_dir, write_json, write_text
 
-def generate_metrics_report(results: List[Dict[str, Any]], output_path: str = 'output/metrics_report.md') -> str:
-    """Generate comprehensive metrics report in Markdown."""
-    
-    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-    
-    # Calculate metrics
-    pass_rate = schema_pass_rate(results)
-    latency = latency_stats(results)
-    errors = error_analysis(results)
-    rag_metrics = rag_retrieval_metrics(results)
-    confidence = confidence_distribution(results)
-    
-    # Generate report
-    report = f"""# Evaluation Report
-Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+def generate_metrics_report(
+    results: List[Dict[str, Any]],
+    output_path: str = 'output/metrics_report.md',
+    now: Optional[datetime] = None
+) -> str:
+    """Generate comprehensive metrics report in Markdown, stamped with now (default: current time)."""
+    if now is None:
+        now = datetime.now()
+    
+    ensure_dir(Path(output_path).parent)
+    
+    # Calculate metrics in one pass
+    metrics = compute_all_metrics(results)
+    pass_rate = metrics['schema_pass_rate']
+    latency = metrics['latency_stats']
+    errors = metrics['error_analysis']
+    rag_metrics = metrics['rag_metrics']
+    confidence = metrics['confidence_distribution']
+    
+    error_rate = errors['error_rate']
+    low_coverage = rag_metrics.get('context_coverage_low_pct', 0) if rag_metrics else 0
+    
+    # Generate report as a list of fragments joined once at the end
+    parts = [f"""# Evaluation Report
+Generated: {now.strftime('%Y-%m-%d %H:%M:%S')}
 
 ## Executive Summary
 - **Total Queries**: {len(results)}
 - **Valid Schema Outputs**: {pass_rate:.1f}%
-- **Error Rate**: {errors['error_rate']:.1f}%
+- **Error Rate**: {error_rate:.1f}%
 - **Average Latency**: {latency['mean']:.2f}s
 
 ## Detailed Metrics
@@ -44,77 +51,75 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 ### Errors
 - **Total Errors**: {errors['total_errors']}
-- **Error Rate**: {errors['error_rate']:.1f}%
+- **Error Rate**: {error_rate:.1f}%
 - **Error Breakdown**:
-"""
+"""]
     
     for error_type, count in errors['error_breakdown'].items():
-        report += f"  - {error_type}: {count}\n"
+        parts.append(f"  - {error_type}: {count}\n")
     
     # RAG metrics if available
     if rag_metrics:
-        report += f"\n### RAG Retrieval\n"
-        report += f"- High Context Coverage: {rag_metrics.get('context_coverage_high_pct', 0):.1f}%\n"
-        report += f"- Medium Context Coverage: {rag_metrics.get('context_coverage_medium_pct', 0):.1f}%\n"
-        report += f"- Low Context Coverage: {rag_metrics.get('context_coverage_low_pct', 0):.1f}%\n"
+        parts.append("\n### RAG Retrieval\n")
+        parts.append(f"- High Context Coverage: {rag_metrics.get('context_coverage_high_pct', 0):.1f}%\n")
+        parts.append(f"- Medium Context Coverage: {rag_metrics.get('context_coverage_medium_pct', 0):.1f}%\n")
+        parts.append(f"- Low Context Coverage: {low_coverage:.1f}%\n")
     
     # Confidence distribution
-    report += f"\n### Confidence Distribution\n"
-    report += f"- High Confidence: {confidence['high']:.1f}%\n"
-    report += f"- Medium Confidence: {confidence['medium']:.1f}%\n"
-    report += f"- Low Confidence: {confidence['low']:.1f}%\n"
+    parts.append("\n### Confidence Distribution\n")
+    parts.append(f"- High Confidence: {confidence['high']:.1f}%\n")
+    parts.append(f"- Medium Confidence: {confidence['medium']:.1f}%\n")
+    parts.append(f"- Low Confidence: {confidence['low']:.1f}%\n")
     
     # Schema breakdown
-    schema_breakdown = {}
-    for r in results:
-        schema = r.get('schema_type', 'unknown')
-        if schema not in schema_breakdown:
-            schema_breakdown[schema] = {'total': 0, 'valid': 0}
-        schema_breakdown[schema]['total'] += 1
-        if r.get('valid_output'):
-            schema_breakdown[schema]['valid'] += 1
-    
-    report += f"\n### By Schema Type\n"
-    for schema, counts in schema_breakdown.items():
-        valid_pct = (counts['valid'] / counts['total'] * 100) if counts['total'] > 0 else 0
-        report += f"- **{schema}**: {counts['valid']}/{counts['total']} valid ({valid_pct:.1f}%)\n"
+    parts.append("\n### By Schema Type\n")
+    for schema, counts in metrics['schema_breakdown'].items():
+        valid, total = counts['valid'], counts['total']
+        parts.append(f"- **{schema}**: {valid}/{total} valid ({valid / total * 100:.1f}%)\n")
     
     # Recommendations
-    report += f"\n## Recommendations\n"
+    parts.append("\n## Recommendations\n")
     if pass_rate < 80:
-        report += f"- ⚠️ Schema validation pass rate is {pass_rate:.1f}%. Review prompt templates and output formats.\n"
-    if errors['error_rate'] > 5:
-        report += f"- ⚠️ Error rate is {errors['error_rate']:.1f}%. Check error logs for details.\n"
-    if rag_metrics and rag_metrics.get('context_coverage_low_pct', 0) > 30:
-        report += f"- ⚠️ Low context coverage at {rag_metrics.get('context_coverage_low_pct', 0):.1f}%. Consider expanding knowledge base.\n"
+        parts.append(f"- ⚠️ Schema validation pass rate is {pass_rate:.1f}%. Review prompt templates and output formats.\n")
+    if error_rate > 5:
+        parts.append(f"- ⚠️ Error rate is {error_rate:.1f}%. Check error logs for details.\n")
+    if low_coverage > 30:
+        parts.append(f"- ⚠️ Low context coverage at {low_coverage:.1f}%. Consider expanding knowledge base.\n")
     if latency['mean'] > 5:
-        report += f"- ⚠️ Average latency is {latency['mean']:.2f}s. Consider optimizing retrieval or model selection.\n"
+        parts.append(f"- ⚠️ Average latency is {latency['mean']:.2f}s. Consider optimizing retrieval or model selection.\n")
     
-    if pass_rate >= 90 and errors['error_rate'] < 2:
-        report += f"- ✅ System performance is excellent!\n"
+    if pass_rate >= 90 and error_rate < 2:
+        parts.append("- ✅ System performance is excellent!\n")
+    
+    report = ''.join(parts)
     
     # Save report
-    with open(output_path, 'w') as f:
-        f.write(report)
+    write_text(output_path, report)
     
     return report
 
-def generate_json_metrics(results: List[Dict[str, Any]], output_path: str = 'output/metrics.json') -> Dict[str, Any]:
-    """Generate metrics in JSON format."""
-    
-    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-    
+def generate_json_metrics(
+    results: List[Dict[str, Any]],
+    output_path: str = 'output/metrics.json',
+    now: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """Generate metrics in JSON format, stamped with now (default: current time)."""
+    if now is None:
+        now = datetime.now()
+    
+    ensure_dir(Path(output_path).parent)
+    
+    metrics = compute_all_metrics(results)
     metrics_data = {
-        'timestamp': datetime.now().isoformat(),
-        'total_queries': len(results),
-        'schema_pass_rate': schema_pass_rate(results),
-        'latency_stats': latency_stats(results),
-        'error_analysis': error_analysis(results),
-        'rag_metrics': rag_retrieval_metrics(results),
-        'confidence_distribution': confidence_distribution(results)
+        'timestamp': now.isoformat(),
+        'total_queries': metrics['total_queries'],
+        'schema_pass_rate': metrics['schema_pass_rate'],
+        'latency_stats': metrics['latency_stats'],
+        'error_analysis': metrics['error_analysis'],
+        'rag_metrics': metrics['rag_metrics'],
+        'confidence_distribution': metrics['confidence_distribution']
     }
     
-    with open(output_path, 'w') as f:
-        json.dump(metrics_data, f, indent=2)
+    write_json(output_path, metrics_data)
     
     return metrics_data
@@ -0,0 +1,17 @@
+"""Optional Numba support shared by the compiled kernels.
+
+Import njit and NUMBA_AVAILABLE from here: without Numba installed, njit is
+a no-op decorator so kernel modules stay importable, and callers fall back
+to their pure-Python paths when NUMBA_AVAILABLE is False.
+"""
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in so kernels stay importable without Numba."""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
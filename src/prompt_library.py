@@ -7,7 +7,17 @@ Each template follows best practices:
 - Context grounding for RAG
 - Confidence levels
 - Fallback handling
+
+Layout invariant: every template is a static prefix (instructions, schema,
+constraints) followed by dynamic_section(). Retrieved context and the query
+only ever appear after len(static prefix), so the prefix is byte-identical
+across calls for a schema type and Ollama can reuse its prompt cache.
 """
+import functools
+
+CONTEXT_PLACEHOLDER = "{{context}}"
+QUERY_PLACEHOLDER = "{{query}}"
+
 
 def best_practices_header() -> str:
     """Core prompting principles for all templates."""
@@ -199,15 +209,12 @@ def rag_prompt() -> str:
 
 TASK: Answer the user's query using the provided context strictly.
 
-IMPORTANT: Your answer MUST be grounded in the provided context below.
+IMPORTANT: Your answer MUST be grounded in the CONTEXT given after these instructions.
 - Only use information from the context
 - If context doesn't contain the answer, explicitly say "I don't have enough information to answer this"
 - Cite specific parts of the context in your answer
 - Don't hallucinate or use general knowledge
 
-CONTEXT:
-{{context}}
-
 SCHEMA (Return ONLY valid JSON):
 {{
   "answer": "answer based on context",
@@ -246,8 +253,14 @@ def confidence_matrix() -> dict:
     }
 
 
+def dynamic_section() -> str:
+    """Trailing section holding the per-call context and query placeholders."""
+    return f"\n{CONTEXT_PLACEHOLDER}\n\n{QUERY_PLACEHOLDER}"
+
+
+@functools.lru_cache(maxsize=None)
 def get_prompt_template(schema_type: str) -> str:
-    """Retrieve prompt template by schema type."""
+    """Retrieve prompt template by schema type (built once per schema, then cached)."""
     templates = {
         "generic_extraction": schema_generic_extraction,
         "classification": schema_classification,
@@ -260,7 +273,19 @@ def get_prompt_template(schema_type: str) -> str:
     if schema_type not in templates:
         raise ValueError(f"Unknown schema type: {schema_type}. Available: {list(templates.keys())}")
     
-    return templates[schema_type]()
+    return templates[schema_type]() + dynamic_section()
+
+
+@functools.lru_cache(maxsize=None)
+def split_prompt_template(schema_type: str) -> tuple:
+    """Split a template around its placeholders into (prefix, between, suffix).
+    
+    Cached per schema type, so callers can assemble a prompt with a single
+    f-string instead of re-rendering the template and scanning it with replace().
+    """
+    prefix, rest = get_prompt_template(schema_type).split(CONTEXT_PLACEHOLDER, 1)
+    between, suffix = rest.split(QUERY_PLACEHOLDER, 1)
+    return prefix, between, suffix
 
 
 def list_available_schemas() -> list:
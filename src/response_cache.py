@@ -0,0 +1,114 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from src.config import RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_S, RESPONSE_CACHE_MIN_SIMILARITY
+
+def make_cache_key(schema_type: str, variant: Any, query: str) -> bytes:
+    """Build a cache key from schema type, pipeline variant and normalized query.
+
+    A missing query (None) keys like an empty one, so the pipeline can still
+    report it as a per-row error instead of raising here.
+    """
+    normalized = (query or '').strip().lower()
+    return hashlib.sha1(f"{schema_type}|{variant}|{normalized}".encode()).digest()
+
+class QueryCache:
+    """Thread-safe LRU cache of pipeline results with a per-entry TTL.
+
+    Entries can optionally be registered with a query embedding, which enables
+    a semantic lookup tier that reuses the response of a near-identical query.
+    """
+
+    def __init__(
+        self,
+        max_size: int = RESPONSE_CACHE_SIZE,
+        ttl_seconds: float = RESPONSE_CACHE_TTL_S,
+        min_similarity: float = RESPONSE_CACHE_MIN_SIMILARITY
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.min_similarity = min_similarity
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._vectors: Dict[bytes, Tuple[str, np.ndarray]] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached result for key, or None on miss/expiry."""
+        with self._lock:
+            value = self._lookup(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return copy.deepcopy(value)
+
+    def get_similar(self, embedding, namespace: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the closest cached result in namespace above the threshold."""
+        query_vec = _unit_vector(embedding)
+        with self._lock:
+            candidates = [(key, vec) for key, (ns, vec) in self._vectors.items() if ns == namespace]
+            if candidates:
+                sims = np.stack([vec for _, vec in candidates]) @ query_vec
+                best = int(np.argmax(sims))
+                if sims[best] > self.min_similarity:
+                    value = self._lookup(candidates[best][0])
+                    if value is not None:
+                        self.hits += 1
+                        return copy.deepcopy(value)
+            self.misses += 1
+            return None
+
+    def put(self, key: bytes, value: Dict[str, Any], embedding=None, namespace: str = "") -> None:
+        """Store a copy of value under key, evicting least recently used entries."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            if embedding is not None:
+                self._vectors[key] = (namespace, _unit_vector(embedding))
+            while len(self._entries) > self.max_size:
+                old_key, _ = self._entries.popitem(last=False)
+                self._vectors.pop(old_key, None)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all cached entries, e.g. after the knowledge base changes."""
+        with self._lock:
+            self._entries.clear()
+            self._vectors.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return cache size and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+    def _lookup(self, key: bytes) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self._vectors.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+def _unit_vector(embedding) -> np.ndarray:
+    vec = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
@@ -1,23 +1,29 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError
+from typing import List, Optional, Dict, Any, Literal
+
+# Schema instances are only validated, never mutated
+_MODEL_CONFIG = ConfigDict(extra='ignore', frozen=True)
 
 class Entity(BaseModel):
     """Extracted entity with confidence."""
+    model_config = _MODEL_CONFIG
     value: str
     type: str
-    confidence: str = Field(..., pattern="^(high|medium|low)$")
+    confidence: Literal['high', 'medium', 'low']
     source_snippet: Optional[str] = None
 
 class GenericExtractionOutput(BaseModel):
     """Output schema for generic extraction."""
+    model_config = _MODEL_CONFIG
     entities: List[Entity]
     extraction_summary: str
     notes: Optional[str] = None
 
 class ClassificationOutput(BaseModel):
     """Output schema for classification."""
+    model_config = _MODEL_CONFIG
     primary_category: str
-    confidence_primary: str = Field(..., pattern="^(high|medium|low)$")
+    confidence_primary: Literal['high', 'medium', 'low']
     secondary_categories: List[str] = []
     confidence_scores: Dict[str, float]
     reasoning: str
@@ -25,30 +31,29 @@ class ClassificationOutput(BaseModel):
 
 class QnAOutput(BaseModel):
     """Output schema for question answering."""
+    model_config = _MODEL_CONFIG
     answer: str
-    confidence: str = Field(..., pattern="^(high|medium|low)$")
+    confidence: Literal['high', 'medium', 'low']
     source_evidence: List[str] = []
     source_documents: List[str] = []
-    answer_type: str = Field(..., pattern="^(direct|inferred|insufficient_context)$")
+    answer_type: Literal['direct', 'inferred', 'insufficient_context']
     follow_up_questions: List[str] = []
     limitations: Optional[str] = None
 
-class KeyPoint(BaseModel):
-    """Key point in summary."""
-    text: str
-
 class SummarizationOutput(BaseModel):
     """Output schema for summarization."""
+    model_config = _MODEL_CONFIG
     summary: str
     key_points: List[str]
     entities_mentioned: List[str] = []
     topics: List[str] = []
-    tone: str = Field(..., pattern="^(formal|informal|neutral)$")
+    tone: Literal['formal', 'informal', 'neutral']
     compression_ratio: float
-    completeness: str = Field(..., pattern="^(high|medium|low)$")
+    completeness: Literal['high', 'medium', 'low']
 
 class ActionStep(BaseModel):
     """Step in an action plan."""
+    model_config = _MODEL_CONFIG
     step_number: int
     action: str
     details: str
@@ -58,19 +63,21 @@ class ActionStep(BaseModel):
 
 class ActionPlanOutput(BaseModel):
     """Output schema for action plans."""
+    model_config = _MODEL_CONFIG
     objective: str
     steps: List[ActionStep]
     total_duration: str
     risks: List[str] = []
-    success_rate: str = Field(..., pattern="^(high|medium|low)$")
+    success_rate: Literal['high', 'medium', 'low']
 
 class RAGOutput(BaseModel):
     """Output schema for RAG queries."""
+    model_config = _MODEL_CONFIG
     answer: str
-    confidence: str = Field(..., pattern="^(high|medium|low)$")
+    confidence: Literal['high', 'medium', 'low']
     evidence_used: List[str] = []
-    context_coverage: str = Field(..., pattern="^(high|medium|low)$")
-    answer_status: str = Field(..., pattern="^(answered|partial|unable_to_answer)$")
+    context_coverage: Literal['high', 'medium', 'low']
+    answer_status: Literal['answered', 'partial', 'unable_to_answer']
 
 # Mapping for easy access
 SCHEMA_MODELS = {
@@ -82,15 +89,19 @@ SCHEMA_MODELS = {
     "rag": RAGOutput,
 }
 
+# Validators built once at import; validate_python runs in pydantic-core
+_ADAPTERS = {name: TypeAdapter(model) for name, model in SCHEMA_MODELS.items()}
+
 def validate_output(output_dict: Dict[str, Any], schema_type: str) -> bool:
     """Validate output against schema."""
-    if schema_type not in SCHEMA_MODELS:
+    adapter = _ADAPTERS.get(schema_type)
+    if adapter is None:
         return False
     
     try:
-        SCHEMA_MODELS[schema_type](**output_dict)
+        adapter.validate_python(output_dict)
         return True
-    except Exception:
+    except ValidationError:
         return False
 
 def get_schema_model(schema_type: str):
@@ -1,23 +1,79 @@
+import functools
 import re
+from typing import List
 from src.config import ENABLE_PII_DETECTION, REDACT_EMAIL, REDACT_PHONE, REDACT_SSN
 
 EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
 PHONE_PATTERN = r'\b(?:\+?1[-.]?)?(?:\([0-9]{3}\)|[0-9]{3})[-.]?[0-9]{3}[-.]?[0-9]{4}\b'
 SSN_PATTERN = r'\b\d{3}-\d{2}-\d{4}\b'
 
+EMAIL_RE = re.compile(EMAIL_PATTERN)
+PHONE_RE = re.compile(PHONE_PATTERN)
+SSN_RE = re.compile(SSN_PATTERN)
+
+# (kind, regex, enabled, replacement), in the order the patterns take precedence
+_PII_RULES = (
+    ('email', EMAIL_RE, REDACT_EMAIL, '[EMAIL_REDACTED]'),
+    ('phone', PHONE_RE, REDACT_PHONE, '[PHONE_REDACTED]'),
+    ('ssn', SSN_RE, REDACT_SSN, '[SSN_REDACTED]'),
+)
+_REPLACEMENTS = {kind: replacement for kind, _, enabled, replacement in _PII_RULES if enabled}
+
+_DROP_DIGITS = str.maketrans('', '', '0123456789')
+
+# Cheap necessary conditions: text failing one cannot contain a match for that kind
+_PREFILTERS = {
+    'email': lambda text: '@' in text,
+    'phone': lambda text: len(text) - len(text.translate(_DROP_DIGITS)) >= 10,
+    'ssn': lambda text: '-' in text,
+}
+
+def _candidate_kinds(text: str) -> tuple:
+    """Return the enabled PII kinds whose prefilter passes for text."""
+    return tuple(kind for kind in _REPLACEMENTS if _PREFILTERS[kind](text))
+
+def _batch_candidate_kinds(texts: List[str]) -> List[tuple]:
+    """_candidate_kinds for many texts, using one compiled byte scan when Numba is available."""
+    # Imported here so only bulk callers pay for loading Numba
+    from src.security_numba import NUMBA_AVAILABLE, AT, DASH, DIGITS, scan_pii_counts
+    if not NUMBA_AVAILABLE:
+        return [_candidate_kinds(text) for text in texts]
+    counts = scan_pii_counts(texts)
+    passed = {
+        'email': counts[:, AT] > 0,
+        'phone': counts[:, DIGITS] >= 10,
+        'ssn': counts[:, DASH] > 0,
+    }
+    return [tuple(kind for kind in _REPLACEMENTS if passed[kind][i]) for i in range(len(texts))]
+
+@functools.lru_cache(maxsize=None)
+def _pii_regex(kinds: tuple):
+    """Compile one alternation with a named group per kind, so a single scan finds them all."""
+    patterns = {kind: regex.pattern for kind, regex, _, _ in _PII_RULES}
+    return re.compile('|'.join(f'(?P<{kind}>{patterns[kind]})' for kind in kinds))
+
+def _replacement(match) -> str:
+    return _REPLACEMENTS[match.lastgroup]
+
 def redact_pii(text: str) -> str:
     """Redact personally identifiable information from text."""
     if not ENABLE_PII_DETECTION:
         return text
     
-    if REDACT_EMAIL:
-        text = re.sub(EMAIL_PATTERN, '[EMAIL_REDACTED]', text)
-    if REDACT_PHONE:
-        text = re.sub(PHONE_PATTERN, '[PHONE_REDACTED]', text)
-    if REDACT_SSN:
-        text = re.sub(SSN_PATTERN, '[SSN_REDACTED]', text)
+    kinds = _candidate_kinds(text)
+    if not kinds:
+        return text
+    return _pii_regex(kinds).sub(_replacement, text)
+
+def redact_pii_many(texts: List[str]) -> List[str]:
+    """Redact PII from many texts at once, e.g. knowledge-base chunks during ingestion."""
+    if not ENABLE_PII_DETECTION:
+        return list(texts)
     
-    return text
+    return [
+        _pii_regex(kinds).sub(_replacement, text) if kinds else text
+        for text, kinds in zip(texts, _batch_candidate_kinds(texts))
+    ]
 
 def contains_pii(text: str) -> dict:
     """Check if text contains PII and return findings."""
@@ -29,12 +85,10 @@ def contains_pii(text: str) -> dict:
     }
     
     if ENABLE_PII_DETECTION:
-        if REDACT_EMAIL:
-            findings['email'] = re.findall(EMAIL_PATTERN, text)
-        if REDACT_PHONE:
-            findings['phone'] = re.findall(PHONE_PATTERN, text)
-        if REDACT_SSN:
-            findings['ssn'] = re.findall(SSN_PATTERN, text)
+        kinds = _candidate_kinds(text)
+        if kinds:
+            for match in _pii_regex(kinds).finditer(text):
+                findings[match.lastgroup].append(match.group())
         
         findings['has_pii'] = bool(findings['email'] or findings['phone'] or findings['ssn'])
     
@@ -0,0 +1,40 @@
+"""Numba-compiled byte scan behind the PII prefilters for bulk inputs.
+
+Texts are encoded into one UTF-8 buffer and walked once by a compiled loop
+that counts '@', '-' and ASCII digit bytes per text. None of these bytes can
+occur inside a multi-byte UTF-8 sequence, so the counts match the str-based
+prefilters in src.security exactly. Callers should check NUMBA_AVAILABLE and
+use the str-based prefilters when it is False. src.security imports this
+module lazily, so per-query redaction never pays the Numba import.
+"""
+from typing import List
+
+import numpy as np
+from src.numba_support import NUMBA_AVAILABLE, njit
+
+# Column order of the count matrix returned by scan_pii_counts
+AT, DASH, DIGITS = 0, 1, 2
+
+@njit(cache=True)
+def _scan_counts(buf, offsets):
+    """Count '@', '-' and ASCII digits in each buf[offsets[t]:offsets[t + 1]]."""
+    n = offsets.shape[0] - 1
+    counts = np.zeros((n, 3), dtype=np.int64)
+    for t in range(n):
+        for i in range(offsets[t], offsets[t + 1]):
+            b = buf[i]
+            if b == 64:
+                counts[t, 0] += 1
+            elif b == 45:
+                counts[t, 1] += 1
+            elif 48 <= b <= 57:
+                counts[t, 2] += 1
+    return counts
+
+def scan_pii_counts(texts: List[str]) -> np.ndarray:
+    """Return an (n, 3) array of '@', '-' and digit counts, one row per text."""
+    encoded = [text.encode('utf-8', 'surrogatepass') for text in texts]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+    buf = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    return _scan_counts(buf, offsets)
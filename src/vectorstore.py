@@ -1,17 +1,24 @@
-from langchain_community.vectorstores import Chroma
-from src.embeddings import create_embeddings
-from src.config import VECTOR_DB_PATH, VECTOR_DB_COLLECTION
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.config import VECTOR_DB_PATH, VECTOR_DB_COLLECTION, EMBEDDING_WORKERS
 from src.logging_config import logger
-from pathlib import Path
+from src.io_utils import ensure_dir
+
+# Chunks embedded and written to Chroma per round trip
+ADD_BATCH_SIZE = 256
 
 def create_vector_store(embeddings=None, persist_directory=None):
     """Create or load Chroma vector store."""
+    # Imported here so modules that only use the retrieval helpers skip loading Chroma and Ollama
+    from langchain_community.vectorstores import Chroma
+    from src.embeddings import create_embeddings
+    
     if embeddings is None:
         embeddings = create_embeddings()
     if persist_directory is None:
         persist_directory = VECTOR_DB_PATH
     
-    Path(persist_directory).mkdir(parents=True, exist_ok=True)
+    ensure_dir(persist_directory)
     
     vectorstore = Chroma(
         collection_name=VECTOR_DB_COLLECTION,
@@ -22,20 +29,54 @@ def create_vector_store(embeddings=None, persist_directory=None):
     logger.info(f"Initialized Chroma vector store at {persist_directory}")
     return vectorstore
 
-def add_documents_to_store(vectorstore, chunks: list):
-    """Add chunked documents to vector store."""
+def _upsert_batch(vectorstore, batch: list, vectors, write_lock) -> None:
+    """Embed one batch of chunks if needed, then upsert it under write_lock."""
+    texts = [chunk['content'] for chunk in batch]
+    metadatas = [
+        {
+            'source': chunk['source'],
+            'chunk_index': chunk.get('chunk_index', 0)
+        }
+        for chunk in batch
+    ]
+    ids = [chunk['id'] for chunk in batch]
+    
+    if vectors is None:
+        vectors = vectorstore.embeddings.embed_documents(texts)
+    with write_lock:
+        vectorstore._collection.upsert(
+            ids=ids, embeddings=vectors, metadatas=metadatas, documents=texts
+        )
+
+def add_documents_to_store(vectorstore, chunks: list, vectors: list = None):
+    """Add chunked documents to vector store in batches of ADD_BATCH_SIZE.
+    
+    Each batch is embedded with one embed_documents call (unless precomputed
+    vectors are given) and written with one collection upsert, bypassing
+    LangChain's add_texts wrapper. Embedding requests for different batches
+    run on up to EMBEDDING_WORKERS threads; upserts are serialized.
+    """
     try:
-        texts = [chunk['content'] for chunk in chunks]
-        metadatas = [
-            {
-                'source': chunk['source'],
-                'chunk_index': chunk.get('chunk_index', 0)
-            }
-            for chunk in chunks
+        write_lock = threading.Lock()
+        batches = [
+            (
+                chunks[start:start + ADD_BATCH_SIZE],
+                vectors[start:start + ADD_BATCH_SIZE] if vectors is not None else None
+            )
+            for start in range(0, len(chunks), ADD_BATCH_SIZE)
         ]
-        ids = [chunk['id'] for chunk in chunks]
         
-        vectorstore.add_texts(texts=texts, metadatas=metadatas, ids=ids)
+        if vectors is None and len(batches) > 1 and EMBEDDING_WORKERS > 1:
+            with ThreadPoolExecutor(max_workers=EMBEDDING_WORKERS) as executor:
+                futures = [
+                    executor.submit(_upsert_batch, vectorstore, batch, batch_vectors, write_lock)
+                    for batch, batch_vectors in batches
+                ]
+                for future in futures:
+                    future.result()
+        else:
+            for batch, batch_vectors in batches:
+                _upsert_batch(vectorstore, batch, batch_vectors, write_lock)
         logger.info(f"Added {len(chunks)} chunks to vector store")
         return vectorstore
     except Exception as e:
@@ -58,3 +99,56 @@ def retrieve_documents(vectorstore, query: str, k: int = 5) -> list:
     except Exception as e:
         logger.error(f"Error retrieving documents: {e}")
         return []
+
+def retrieve_documents_batch(vectorstore, queries: list, k: int = 5) -> list:
+    """Retrieve top-k documents for each query with one collection query.
+    
+    Queries go through embed_query, like retrieve_documents, since some
+    embedders (e.g. Ollama's query/passage instructions) embed queries and
+    documents differently. The per-query embedding requests run on up to
+    EMBEDDING_WORKERS threads.
+    """
+    if not queries:
+        return []
+    try:
+        workers = max(min(EMBEDDING_WORKERS, len(queries)), 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            query_vectors = list(executor.map(vectorstore.embeddings.embed_query, queries))
+        results = vectorstore._collection.query(
+            query_embeddings=query_vectors,
+            n_results=k,
+            include=['documents', 'metadatas', 'distances']
+        )
+        return [
+            [
+                {
+                    'content': content,
+                    'metadata': metadata or {},
+                    'score': score
+                }
+                for content, metadata, score in zip(contents, metadatas, distances)
+            ]
+            for contents, metadatas, distances in zip(
+                results['documents'], results['metadatas'], results['distances']
+            )
+        ]
+    except Exception as e:
+        logger.error(f"Error retrieving documents: {e}")
+        return [[] for _ in queries]
+
+async def aretrieve_documents(vectorstore, query: str, k: int = 5) -> list:
+    """Async variant of retrieve_documents."""
+    try:
+        results = await vectorstore.asimilarity_search_with_score(query, k=k)
+        documents = [
+            {
+                'content': doc.page_content,
+                'metadata': doc.metadata,
+                'score': score
+            }
+            for doc, score in results
+        ]
+        return documents
+    except Exception as e:
+        logger.error(f"Error retrieving documents: {e}")
+        return []
@@ -1,11 +1,18 @@
 import pytest
 import json
+import numpy as np
 from pathlib import Path
 from src.config import OLLAMA_BASE_URL
 from src.data_loader import load_csv, load_txt, load_kb_directory
-from src.chunking import chunk_documents
+from src.chunking import chunk_documents, fast_chunk
 from src.schemas import validate_output, SCHEMA_MODELS
-from src.prompt_library import get_prompt_template, list_available_schemas
+from src.prompt_library import get_prompt_template, list_available_schemas, split_prompt_template
+from src.response_cache import QueryCache, make_cache_key
+from src.embedding_cache import EmbeddingCache
+from src.agent import _parse_json_response
+from src.rouge_numba import rouge_fmeasures
+from src.security import redact_pii, redact_pii_many, contains_pii
+from src import metrics
 
 class TestConfig:
     """Test configuration loading."""
@@ -28,6 +35,21 @@ class TestDataLoading:
             data = load_txt(txt_path)
             assert isinstance(data, str)
 
+    def test_kb_csv_flattened_per_row(self):
+        documents = load_kb_directory('data/kb')
+        csv_docs = [d for d in documents if d['source'].endswith('.csv')]
+        if csv_docs:
+            first_line = csv_docs[0]['content'].splitlines()[0]
+            assert first_line.startswith('id: ')
+            assert ' | title: ' in first_line
+
+    def test_kb_ids_keep_stem_unless_shared(self, tmp_path):
+        for name in ('a/notes.txt', 'b/notes.txt', 'other.txt'):
+            (tmp_path / name).parent.mkdir(exist_ok=True)
+            (tmp_path / name).write_text('content')
+        ids = {d['source']: d['id'] for d in load_kb_directory(str(tmp_path))}
+        assert sorted(ids.values()) == ['b/notes.txt', 'notes', 'other']
+
 class TestPromptLibrary:
     """Test prompt library functionality."""
     def test_available_schemas(self):
@@ -42,6 +64,19 @@ class TestPromptLibrary:
             assert isinstance(template, str)
             assert len(template) > 0
 
+    def test_dynamic_fields_follow_static_prefix(self):
+        for schema in list_available_schemas():
+            template = get_prompt_template(schema)
+            assert template.count('{{context}}') == 1
+            assert template.endswith('{{query}}')
+            assert template.index('{{context}}') > template.index('CONSTRAINTS:')
+
+    def test_split_template_reassembles(self):
+        for schema in list_available_schemas():
+            prefix, between, suffix = split_prompt_template(schema)
+            expected = f"{prefix}{{{{context}}}}{between}{{{{query}}}}{suffix}"
+            assert expected == get_prompt_template(schema)
+
 class TestSchemas:
     """Test schema validation."""
     def test_classification_schema(self):
@@ -69,6 +104,18 @@ class TestSchemas:
         output = {"invalid": "data"}
         assert not validate_output(output, "classification")
 
+    def test_enum_fields_reject_unknown_values(self):
+        output = {
+            "answer": "42",
+            "confidence": "high",
+            "evidence_used": [],
+            "context_coverage": "medium",
+            "answer_status": "answered"
+        }
+        assert validate_output(output, "rag")
+        assert not validate_output({**output, "confidence": "very high"}, "rag")
+        assert not validate_output({**output, "answer_status": "done"}, "rag")
+
 class TestChunking:
     """Test document chunking."""
     def test_chunk_documents(self):
@@ -83,5 +130,296 @@ class TestChunking:
         assert len(chunks) > 1
         assert all('content' in chunk for chunk in chunks)
 
+    def test_fast_chunk(self):
+        text = '\n'.join(f'line {i} \u00e9' for i in range(500))
+        chunks = fast_chunk(text, chunk_size=100, overlap=20)
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 100 for chunk in chunks)
+        assert chunks[0].startswith('line 0') and chunks[-1].endswith('line 499 \u00e9')
+        assert fast_chunk('A' * 250, chunk_size=100, overlap=20) == ['A' * 100, 'A' * 100, 'A' * 90]
+
+    def test_fast_chunk_newline_near_window_start(self):
+        # A newline inside the overlap must not pin the next window to start + 1
+        text = 'a' * 100 + '\n' + 'b' * 1500 + '\n' + 'c' * 300
+        chunks = fast_chunk(text, chunk_size=900, overlap=200)
+        assert [len(chunk) for chunk in chunks] == [900, 900, 502]
+        assert all(len(chunk) <= 900 for chunk in chunks)
+        assert chunks[-1].endswith('c' * 300)
+        sparse = ('Heading\n' + 'word ' * 300 + '\n') * 5
+        assert len(fast_chunk(sparse, chunk_size=900, overlap=200)) <= 15
+
+class TestResponseParsing:
+    """Test LLM response parsing."""
+    def test_strips_code_fence(self):
+        assert _parse_json_response('```json\n{"a": 1}\n```\n') == {'a': 1}
+        assert _parse_json_response('```\n{"a": 1}\n```') == {'a': 1}
+        assert _parse_json_response('  {"a": 1}  ') == {'a': 1}
+
+class TestResponseCache:
+    """Test response caching."""
+    def test_key_normalizes_query(self):
+        assert make_cache_key('qna', True, '  Hello ') == make_cache_key('qna', True, 'hello')
+        assert make_cache_key('qna', True, 'hello') != make_cache_key('qna', False, 'hello')
+
+    def test_lru_eviction_and_copy(self):
+        cache = QueryCache(max_size=2, ttl_seconds=60)
+        cache.put(b'a', {'result': {'x': 1}})
+        cache.put(b'b', {'result': {'x': 2}})
+        cache.get(b'a')['result']['x'] = 99
+        cache.put(b'c', {'result': {'x': 3}})
+        assert cache.get(b'b') is None
+        assert cache.get(b'a') == {'result': {'x': 1}}
+        assert cache.evictions == 1
+
+    def test_semantic_lookup(self):
+        cache = QueryCache(max_size=4, ttl_seconds=60, min_similarity=0.9)
+        cache.put(b'a', {'result': 1}, embedding=[1.0, 0.0], namespace='qna')
+        assert cache.get_similar([0.99, 0.05], 'qna') == {'result': 1}
+        assert cache.get_similar([0.99, 0.05], 'rag') is None
+        assert cache.get_similar([0.0, 1.0], 'qna') is None
+
+class TestEmbeddingCache:
+    """Test the persistent embedding cache."""
+    def test_round_trip_per_model(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path / 'emb.db'), model='m1')
+        cache.put_many(['a', 'b'], [[0.5, 1.0], [2.0, 3.0]])
+        assert cache.get_many(['a', 'b', 'c']) == {'a': [0.5, 1.0], 'b': [2.0, 3.0]}
+        other = EmbeddingCache(str(tmp_path / 'emb.db'), model='m2')
+        assert other.get_many(['a']) == {}
+        cache.clear()
+        assert cache.get_many(['a']) == {}
+
+    def test_batched_embedding_fills_cache_in_order(self, tmp_path):
+        from langchain_community.embeddings import DeterministicFakeEmbedding
+        from src.embeddings import embed_texts_batched
+        embeddings = DeterministicFakeEmbedding(size=4)
+        texts = [f'text {i % 7}' for i in range(20)]
+        cache = EmbeddingCache(str(tmp_path / 'emb.db'), model='fake')
+        vectors = embed_texts_batched(embeddings, texts, batch_size=2, cache=cache)
+        expected = embeddings.embed_documents(texts)
+        assert all(np.allclose(a, b) for a, b in zip(vectors, expected))
+        assert len(cache.get_many(texts)) == 7
+
+    def test_quantized_round_trip_and_separate_keys(self, tmp_path):
+        path = str(tmp_path / 'emb.db')
+        vec = np.random.default_rng(0).normal(size=16).astype(np.float32)
+        EmbeddingCache(path, model='m', quantization='none').put_many(['a'], [vec])
+        for quantization, atol in (('fp16', 1e-2), ('int8', float(np.abs(vec).max()) / 127)):
+            cache = EmbeddingCache(path, model='m', quantization=quantization)
+            assert cache.get_many(['a']) == {}
+            stored = cache.put_many(['a'], [vec])
+            assert cache.get_many(['a']) == {'a': stored[0]}
+            assert np.allclose(stored[0], vec, atol=atol)
+        assert np.array_equal(EmbeddingCache(path, model='m').get_many(['a'])['a'], vec)
+
+    def test_reindex_uses_same_quantized_vectors(self, tmp_path):
+        from langchain_community.embeddings import DeterministicFakeEmbedding
+        from src.embeddings import embed_texts_batched
+        embeddings = DeterministicFakeEmbedding(size=8)
+        cache = EmbeddingCache(str(tmp_path / 'emb.db'), model='fake', quantization='int8')
+        texts = ['alpha', 'beta', 'gamma']
+        first = embed_texts_batched(embeddings, texts, cache=cache)
+        assert embed_texts_batched(embeddings, texts, cache=cache) == first
+
+class TestVectorStore:
+    """Test batched writes to the vector store."""
+    def test_add_documents_across_batches(self, tmp_path):
+        from langchain_community.embeddings import FakeEmbeddings
+        from src.vectorstore import create_vector_store, add_documents_to_store, ADD_BATCH_SIZE
+        store = create_vector_store(
+            embeddings=FakeEmbeddings(size=8), persist_directory=str(tmp_path))
+        chunks = [
+            {'id': f'c{i}', 'content': f'chunk {i}', 'source': 'doc'}
+            for i in range(ADD_BATCH_SIZE + 10)
+        ]
+        add_documents_to_store(store, chunks)
+        add_documents_to_store(store, chunks[:5])
+        assert store._collection.count() == len(chunks)
+
+    def test_batch_retrieval_matches_single(self, tmp_path):
+        from langchain_community.embeddings import DeterministicFakeEmbedding
+        from src.vectorstore import (
+            create_vector_store, add_documents_to_store, retrieve_documents,
+            retrieve_documents_batch,
+        )
+
+        class QueryInstructionEmbedding(DeterministicFakeEmbedding):
+            # Embed queries differently from documents, like Ollama's instructions
+            def embed_query(self, text):
+                return super().embed_query(f"query: {text}")
+
+        store = create_vector_store(
+            embeddings=QueryInstructionEmbedding(size=8), persist_directory=str(tmp_path))
+        add_documents_to_store(store, [
+            {'id': f'c{i}', 'content': f'chunk {i}', 'source': 'doc', 'chunk_index': i}
+            for i in range(10)
+        ])
+        queries = ['chunk 3', 'something else']
+        batched = retrieve_documents_batch(store, queries, k=3)
+        for query, docs in zip(queries, batched):
+            single = retrieve_documents(store, query, k=3)
+            assert [d['content'] for d in docs] == [d['content'] for d in single]
+            assert [d['metadata'] for d in docs] == [d['metadata'] for d in single]
+            assert all(abs(a['score'] - b['score']) < 1e-6 for a, b in zip(docs, single))
+
+class TestSecurity:
+    """Test PII detection and redaction."""
+    def test_redact_and_detect(self):
+        text = "Mail john.doe@example.com or call 555-123-4567, SSN 123-45-6789."
+        assert redact_pii(text) == (
+            "Mail [EMAIL_REDACTED] or call [PHONE_REDACTED], SSN [SSN_REDACTED].")
+        findings = contains_pii(text)
+        assert findings['has_pii']
+        assert findings['email'] == ['john.doe@example.com']
+        assert findings['phone'] == ['555-123-4567']
+        assert findings['ssn'] == ['123-45-6789']
+        assert not contains_pii("nothing to see here")['has_pii']
+
+    def test_redact_many_matches_single(self):
+        texts = ["a@b.com", "call 555-123-4567", "", "ssn 123-45-6789 ü", "no pii - 12"]
+        assert redact_pii_many(texts) == [redact_pii(text) for text in texts]
+
+class TestMetrics:
+    """Test the fused metrics pass against the per-metric helpers."""
+    def test_compute_all_metrics_matches_helpers(self):
+        results = [
+            {'schema_type': 'qna', 'mode': 'rag', 'valid_output': True, 'latency_s': 1.5,
+             'error': None, 'result': {'confidence': 'high', 'context_coverage': 'medium'}},
+            {'schema_type': 'qna', 'mode': 'direct', 'valid_output': False, 'latency_s': 0.5,
+             'error': {'type': 'JSONDecodeError', 'msg': 'bad'}, 'result': None},
+            {'schema_type': 'classification', 'mode': 'rag', 'valid_output': True, 'latency_s': 3.0,
+             'error': None, 'result': {'confidence': 'low'}},
+        ]
+        fused = metrics.compute_all_metrics(results)
+        assert fused['schema_pass_rate'] == metrics.schema_pass_rate(results)
+        assert fused['latency_stats'] == metrics.latency_stats(results)
+        assert fused['error_analysis'] == metrics.error_analysis(results)
+        assert fused['rag_metrics'] == metrics.rag_retrieval_metrics(results)
+        assert fused['confidence_distribution'] == metrics.confidence_distribution(results)
+        assert fused['schema_breakdown'] == {
+            'qna': {'total': 2, 'valid': 1},
+            'classification': {'total': 1, 'valid': 1}
+        }
+
+    def test_compute_all_metrics_vectorized_path(self):
+        # Enough rows to take the NumPy branches of the latency and level counts
+        levels = ['high', 'medium', 'low', 'unsure']
+        results = [
+            {'schema_type': 'qna', 'mode': 'rag' if i % 3 else 'direct', 'valid_output': i % 2 == 0,
+             'latency_s': (i * 37 % 101) / 10, 'error': None,
+             'result': {'confidence': levels[i % 4], 'context_coverage': levels[i * 7 % 3]}}
+            for i in range(metrics._VECTORIZE_MIN + 36)
+        ]
+        fused = metrics.compute_all_metrics(results)
+        assert fused['latency_stats'] == pytest.approx(metrics.latency_stats(results))
+        expected_distribution = metrics.confidence_distribution(results)
+        assert fused['confidence_distribution'] == pytest.approx(expected_distribution)
+        assert fused['rag_metrics'] == pytest.approx(metrics.rag_retrieval_metrics(results))
+
+class TestHttpSession:
+    """Test the pooled HTTP sessions installed into the Ollama modules."""
+    def test_async_sessions_are_shared_per_loop(self):
+        import asyncio
+        import types
+        import aiohttp
+        import requests
+        from src.http_session import install_session, close_async_session
+        module = types.SimpleNamespace(requests=requests, aiohttp=aiohttp)
+        install_session(module)
+
+        async def run():
+            async with module.aiohttp.ClientSession() as first:
+                pass
+            async with module.aiohttp.ClientSession() as second:
+                assert second is first and not first.closed
+            await close_async_session()
+            return first
+
+        session = asyncio.run(run())
+        assert session.closed
+        assert asyncio.run(run()) is not session
+
+class TestAgent:
+    """Test the async pipeline entry points."""
+    def test_semantic_cache_embeds_off_event_loop(self, monkeypatch):
+        import asyncio
+        import threading
+        from types import SimpleNamespace
+        import src.agent
+        from src.agent import RAGAgent
+        monkeypatch.setattr(src.agent, 'RESPONSE_CACHE_SEMANTIC', True)
+        embed_threads = []
+
+        def embed_query(text):
+            embed_threads.append(threading.current_thread())
+            return [1.0, 0.0]
+
+        async def ainvoke(prompt):
+            return SimpleNamespace(content='{"summary": "ok"}')
+
+        vectorstore = SimpleNamespace(embeddings=SimpleNamespace(embed_query=embed_query))
+        agent = RAGAgent(vectorstore=vectorstore)
+        agent.llm = SimpleNamespace(ainvoke=ainvoke)
+        result = asyncio.run(agent.arun_direct('hello', 'summarization'))
+        assert result['result'] == {'summary': 'ok'}
+        assert embed_threads and threading.main_thread() not in embed_threads
+
+    def test_missing_query_does_not_raise(self):
+        from types import SimpleNamespace
+        from src.agent import RAGAgent
+        agent = RAGAgent()
+        agent.llm = SimpleNamespace(invoke=lambda prompt: SimpleNamespace(content='not json'))
+        result = agent.run_rag(None, 'qna', context_docs=[])
+        assert result['query'] is None
+        assert result['error']['type'] == 'JSONDecodeError'
+        assert make_cache_key('qna', True, None) == make_cache_key('qna', True, '')
+
+    def test_only_valid_results_are_cached(self):
+        from types import SimpleNamespace
+        from src.agent import RAGAgent
+        valid = {
+            'summary': 'ok', 'key_points': [], 'tone': 'neutral',
+            'compression_ratio': 0.5, 'completeness': 'high'
+        }
+        responses = ['{"unexpected": true}', json.dumps(valid)]
+        prompts = []
+
+        def invoke(prompt):
+            prompts.append(prompt)
+            return SimpleNamespace(content=responses[min(len(prompts), len(responses)) - 1])
+
+        agent = RAGAgent()
+        agent.llm = SimpleNamespace(invoke=invoke)
+        assert agent.run_direct('text', 'summarization')['valid_output'] is False
+        assert agent.run_direct('text', 'summarization')['valid_output'] is True
+        assert agent.run_direct('text', 'summarization')['valid_output'] is True
+        assert len(prompts) == 2
+
+class TestVerify:
+    """Test the pre-flight verification helpers."""
+    def test_import_all_waits_for_in_progress_import(self, tmp_path, monkeypatch):
+        import verify
+        (tmp_path / 'verify_user_mod.py').write_text('import verify_slowbad\n')
+        (tmp_path / 'verify_slowbad.py').write_text(
+            'import time\ntime.sleep(0.3)\nraise RuntimeError("broken module")\n'
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+        outcomes = verify._import_all(['verify_user_mod', 'verify_slowbad'])
+        assert outcomes['verify_slowbad'][0] is False
+        assert outcomes['verify_user_mod'][0] is False
+
+class TestRouge:
+    """Test compiled ROUGE scoring against rouge_score."""
+    def test_matches_rouge_score(self):
+        from rouge_score import rouge_scorer
+        targets = ['The cats were running home', 'a b c d', '']
+        predictions = ['the cat runs home quickly', 'd c b a', 'anything']
+        scorer = rouge_scorer.RougeScorer(['rouge1', 'rouge2', 'rougeL'], use_stemmer=True)
+        scores = rouge_fmeasures(targets, predictions, ['rouge1', 'rouge2', 'rougeL'])
+        for i, (target, pred) in enumerate(zip(targets, predictions)):
+            expected = scorer.score(target, pred)
+            for rouge_type in scores:
+                assert abs(scores[rouge_type][i] - expected[rouge_type].fmeasure) < 1e-9
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -6,120 +6,316 @@ Run this to verify everything is working before Friday.
 
 import sys
 import os
+import io
+import json
+import functools
+import stat
+import importlib
+import importlib.util
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
-# ANSI colors
-GREEN = '\033[92m'
-RED = '\033[91m'
-YELLOW = '\033[93m'
-RESET = '\033[0m'
+# ANSI colors, left out when stdout is redirected (CI logs, pipes)
+if sys.stdout.isatty():
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    YELLOW = '\033[93m'
+    RESET = '\033[0m'
+else:
+    GREEN = RED = YELLOW = RESET = ''
+
+# --fast: stop each check at its first failure instead of reporting every item
+_FAST = False
+
+_REQUIRED_DIRS = (
+    'src',
+    'data/kb',
+    'data/samples',
+    'data/eval',
+    'output/artifacts',
+    'output/chroma_db',
+    'docs',
+    'tests',
+    '.vscode',
+)
+
+_REQUIRED_FILES = (
+    ('Core Configuration', (
+        'requirements.txt',
+        '.env.example',
+        '.gitignore',
+        'Makefile',
+        'README.md',
+    )),
+    ('Source Modules', (
+        'src/__init__.py',
+        'src/config.py',
+        'src/logging_config.py',
+        'src/security.py',
+        'src/data_loader.py',
+        'src/chunking.py',
+        'src/embeddings.py',
+        'src/vectorstore.py',
+        'src/llm.py',
+        'src/prompt_library.py',
+        'src/schemas.py',
+        'src/agent.py',
+        'src/csv_processor.py',
+        'src/main.py',
+        'src/metrics.py',
+        'src/metrics_report.py',
+        'src/evaluate.py',
+    )),
+    ('Documentation', (
+        'docs/INDEX.md',
+        'docs/pipeline.md',
+        'docs/prompt-library.md',
+        'docs/evaluation.md',
+        'docs/coding-standards.md',
+        'docs/security.md',
+        'docs/slides.md',
+        'QUICKSTART.md',
+    )),
+    ('Tests', (
+        'tests/__init__.py',
+        'tests/test_basic.py',
+    )),
+    ('Sample Data', (
+        'data/kb/sample_kb.csv',
+        'data/kb/sample_kb.txt',
+        'data/samples/sample_input.csv',
+        'data/samples/sample_task.json',
+        'data/eval/sample_eval.jsonl',
+    )),
+    ('VS Code Config', (
+        '.vscode/tasks.json',
+        '.vscode/launch.json',
+    )),
+)
+
+_ALL_REQUIRED_FILES = frozenset(path for _, paths in _REQUIRED_FILES for path in paths)
+
+# Directory listings read so far: parent path -> {name: os.DirEntry}
+_dir_cache = {}
+
+def _list_dir(parent):
+    """Entries of parent keyed by name, read with one os.scandir on first use."""
+    entries = _dir_cache.get(parent)
+    if entries is None:
+        try:
+            with os.scandir(parent or '.') as it:
+                entries = {entry.name: entry for entry in it}
+        except OSError:
+            entries = {}
+        _dir_cache[parent] = entries
+    return entries
+
+def _entry(path):
+    """Cached DirEntry for a relative posix path, or None if it does not exist."""
+    parent, _, name = path.rpartition('/')
+    return _list_dir(parent).get(name)
+
+# Answer from the d_type scandir already returned instead of stat'ing symlink
+# targets; a symlink counts as present
+def _entry_is_dir(entry):
+    return entry.is_dir(follow_symlinks=False) or entry.is_symlink()
+
+def _entry_is_file(entry):
+    return entry.is_file(follow_symlinks=False) or entry.is_symlink()
+
+def _is_dir(path):
+    entry = _entry(path)
+    return entry is not None and _entry_is_dir(entry)
+
+def _is_file(path):
+    entry = _entry(path)
+    return entry is not None and _entry_is_file(entry)
+
+@functools.lru_cache(maxsize=32)
+def _read_text(path):
+    """Contents of a small config file, or None if it can't be read; read at most once."""
+    try:
+        return Path(path).read_text()
+    except OSError:
+        return None
+
+def _present_files(paths):
+    """Subset of paths that exist as files, one set intersection per directory."""
+    wanted = {}
+    for path in paths:
+        parent, _, name = path.rpartition('/')
+        wanted.setdefault(parent, set()).add(name)
+    present = set()
+    for parent, names in wanted.items():
+        entries = _list_dir(parent)
+        prefix = f"{parent}/" if parent else ""
+        present.update(
+            prefix + name for name in names & entries.keys() if _entry_is_file(entries[name]))
+    return present
+
+def _try_import(module_name):
+    """Import module_name; return (ok, exception or None).
+    
+    import_module returns modules that are already loaded and waits on the
+    module lock for ones another thread is still importing, so a module that
+    is in sys.modules but still executing is never reported as OK early.
+    """
+    try:
+        importlib.import_module(module_name)
+        return True, None
+    except Exception as e:
+        return False, e
+
+def _import_all(module_names):
+    """Import modules on a thread pool; return {name: (ok, exception or None)} in input order."""
+    importlib.invalidate_caches()
+    preloaded = {module_name for module_name in module_names if module_name in sys.modules}
+    with ThreadPoolExecutor(max_workers=min(len(module_names), 8)) as executor:
+        outcomes = dict(zip(module_names, executor.map(_try_import, module_names)))
+    if all(ok for ok, _ in outcomes.values()):
+        return outcomes
+    
+    # Concurrent imports of modules that import each other can trip the import
+    # lock's deadlock detection, which either fails an import spuriously or hands
+    # a module a half-initialized dependency that later failed. Redo every fresh
+    # import serially so each outcome matches a plain sequential import.
+    for module_name in module_names:
+        if module_name not in preloaded:
+            sys.modules.pop(module_name, None)
+    for module_name in module_names:
+        if module_name not in preloaded:
+            outcomes[module_name] = _try_import(module_name)
+    return outcomes
+
+def _find_installed(package_names):
+    """Locate top-level packages without executing them; return {name: (ok, exception or None)}."""
+    importlib.invalidate_caches()
+    outcomes = {}
+    for package_name in package_names:
+        if package_name in sys.modules:
+            outcomes[package_name] = (True, None)
+            continue
+        try:
+            spec = importlib.util.find_spec(package_name)
+        except (ImportError, ValueError):
+            # Ambiguous (e.g. a broken __spec__); let a real import decide
+            outcomes[package_name] = _try_import(package_name)
+            continue
+        if spec is None:
+            outcomes[package_name] = (
+                False, ModuleNotFoundError(f"No module named '{package_name}'"))
+        else:
+            outcomes[package_name] = (True, None)
+    return outcomes
+
+EXPECTED_SCHEMAS = (
+    'generic_extraction',
+    'classification',
+    'qna',
+    'summarization',
+    'action_plan',
+    'rag'
+)
+
+def _check_prompt_templates():
+    """Return (error message or None, [(schema, available)])."""
+    try:
+        from src.prompt_library import list_available_schemas
+        
+        schemas = list_available_schemas()
+        return None, [(schema, schema in schemas) for schema in EXPECTED_SCHEMAS]
+    except Exception as e:
+        return str(e), []
+
+def _check_schemas():
+    """Return (error message or None, [(schema, has model)])."""
+    try:
+        from src.schemas import SCHEMA_MODELS
+        
+        return None, [(schema, schema in SCHEMA_MODELS) for schema in EXPECTED_SCHEMAS]
+    except Exception as e:
+        return str(e), []
+
+# Report lines are collected in a per-thread StringIO and written out in one
+# call per section instead of one print() per line
+_OUT = threading.local()
+
+def _emit(text):
+    """Append text to the current thread's output buffer."""
+    buffer = getattr(_OUT, 'buffer', None)
+    if buffer is None:
+        buffer = _OUT.buffer = io.StringIO()
+    buffer.write(text)
+
+def _take_output():
+    """Return and clear the current thread's buffered output."""
+    buffer = getattr(_OUT, 'buffer', None)
+    if buffer is None:
+        return ''
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate(0)
+    return text
+
+def _flush():
+    """Write the current thread's buffered output to stdout."""
+    sys.stdout.write(_take_output())
+    sys.stdout.flush()
+
+def _run_checks(group):
+    """Run a group of checks in order with output buffered; return [(passed, output text)]."""
+    outcomes = []
+    for check_name, check_func in group:
+        try:
+            result = check_func()
+        except Exception as e:
+            _emit(f"\n{RED}❌ {check_name} failed with error: {e}{RESET}\n")
+            result = False
+        outcomes.append((result, _take_output()))
+    return outcomes
 
 def check_mark(condition, message):
     """Print check mark or X based on condition."""
     if condition:
-        print(f"{GREEN}✅{RESET} {message}")
+        _emit(f"{GREEN}✅{RESET} {message}\n")
         return True
     else:
-        print(f"{RED}❌{RESET} {message}")
+        _emit(f"{RED}❌{RESET} {message}\n")
         return False
 
 def print_section(title):
     """Print section header."""
-    print(f"\n{YELLOW}{'=' * 60}{RESET}")
-    print(f"{YELLOW}{title}{RESET}")
-    print(f"{YELLOW}{'=' * 60}{RESET}\n")
+    rule = f"{YELLOW}{'=' * 60}{RESET}"
+    _emit(f"\n{rule}\n{YELLOW}{title}{RESET}\n{rule}\n\n")
 
 def verify_structure():
     """Verify folder structure."""
     print_section("1. FOLDER STRUCTURE")
     
-    required_dirs = [
-        'src',
-        'data/kb',
-        'data/samples',
-        'data/eval',
-        'output/artifacts',
-        'output/chroma_db',
-        'docs',
-        'tests',
-        '.vscode'
-    ]
-    
-    results = []
-    for dir_path in required_dirs:
-        exists = Path(dir_path).is_dir()
-        results.append(check_mark(exists, f"Directory: {dir_path}"))
+    ok = True
+    for dir_path in _REQUIRED_DIRS:
+        ok &= check_mark(_is_dir(dir_path), f"Directory: {dir_path}")
+        if not ok and _FAST:
+            break
     
-    return all(results)
+    return ok
 
 def verify_files():
     """Verify critical files exist."""
     print_section("2. CRITICAL FILES")
     
-    required_files = {
-        'Core Configuration': [
-            'requirements.txt',
-            '.env.example',
-            '.gitignore',
-            'Makefile',
-            'README.md'
-        ],
-        'Source Modules': [
-            'src/__init__.py',
-            'src/config.py',
-            'src/logging_config.py',
-            'src/security.py',
-            'src/data_loader.py',
-            'src/chunking.py',
-            'src/embeddings.py',
-            'src/vectorstore.py',
-            'src/llm.py',
-            'src/prompt_library.py',
-            'src/schemas.py',
-            'src/agent.py',
-            'src/csv_processor.py',
-            'src/main.py',
-            'src/metrics.py',
-            'src/metrics_report.py',
-            'src/evaluate.py'
-        ],
-        'Documentation': [
-            'docs/INDEX.md',
-            'docs/pipeline.md',
-            'docs/prompt-library.md',
-            'docs/evaluation.md',
-            'docs/coding-standards.md',
-            'docs/security.md',
-            'docs/slides.md',
-            'QUICKSTART.md'
-        ],
-        'Tests': [
-            'tests/__init__.py',
-            'tests/test_basic.py'
-        ],
-        'Sample Data': [
-            'data/kb/sample_kb.csv',
-            'data/kb/sample_kb.txt',
-            'data/samples/sample_input.csv',
-            'data/samples/sample_task.json',
-            'data/eval/sample_eval.jsonl'
-        ],
-        'VS Code Config': [
-            '.vscode/tasks.json',
-            '.vscode/launch.json'
-        ]
-    }
-    
-    all_exist = True
-    for category, files in required_files.items():
-        print(f"\n{category}:")
+    present = _present_files(_ALL_REQUIRED_FILES)
+    ok = True
+    for category, files in _REQUIRED_FILES:
+        _emit(f"\n{category}:\n")
         for file_path in files:
-            exists = Path(file_path).is_file()
-            all_exist = all_exist and exists
-            check_mark(exists, file_path)
+            ok &= check_mark(file_path in present, file_path)
+            if not ok and _FAST:
+                return False
     
-    return all_exist
+    return ok
 
 def verify_imports():
     """Verify critical imports work."""
@@ -141,17 +337,21 @@ def verify_imports():
         ('src.main', 'Main CLI'),
     ]
     
-    results = []
-    for module_name, description in imports_to_check:
-        try:
-            __import__(module_name)
-            results.append(check_mark(True, f"{description}: {module_name}"))
-        except Exception as e:
-            print(f"{RED}❌{RESET} {description}: {module_name}")
-            print(f"   Error: {str(e)[:60]}")
-            results.append(False)
+    # In fast mode import one at a time so nothing past the first failure is loaded
+    outcomes = None if _FAST else _import_all([module_name for module_name, _ in imports_to_check])
     
-    return all(results)
+    ok = True
+    for module_name, description in imports_to_check:
+        imported, e = outcomes[module_name] if outcomes is not None else _try_import(module_name)
+        if imported:
+            check_mark(True, f"{description}: {module_name}")
+        else:
+            _emit(f"{RED}❌{RESET} {description}: {module_name}\n   Error: {str(e)[:60]}\n")
+            ok = False
+            if _FAST:
+                break
+    
+    return ok
 
 def verify_dependencies():
     """Check if required packages can be imported."""
@@ -170,16 +370,22 @@ def verify_dependencies():
         ('tqdm', 'tqdm'),
     ]
     
-    results = []
-    for package_name, description in dependencies:
-        try:
-            __import__(package_name)
-            results.append(check_mark(True, f"{description}: {package_name}"))
-        except ImportError:
-            print(f"{RED}❌{RESET} {description}: {package_name} (not installed)")
-            results.append(False)
+    outcomes = _find_installed([package_name for package_name, _ in dependencies])
     
-    return all(results)
+    ok = True
+    for package_name, description in dependencies:
+        installed, e = outcomes[package_name]
+        if installed:
+            check_mark(True, f"{description}: {package_name}")
+        elif isinstance(e, ImportError):
+            _emit(f"{RED}❌{RESET} {description}: {package_name} (not installed)\n")
+            ok = False
+            if _FAST:
+                break
+        else:
+            raise e
+    
+    return ok
 
 def verify_data():
     """Verify sample data exists and is readable."""
@@ -193,25 +399,27 @@ def verify_data():
         'data/eval/sample_eval.jsonl': 'Sample Evaluation Data',
     }
     
-    results = []
+    ok = True
     for file_path, description in data_files.items():
         try:
-            path = Path(file_path)
-            exists = path.is_file() and path.stat().st_size > 0
-            results.append(check_mark(exists, f"{description}: {file_path} ({path.stat().st_size} bytes)"))
-        except Exception as e:
-            check_mark(False, f"{description}: {file_path}")
-            results.append(False)
-    
-    return all(results)
+            # One stat per file answers both "is a regular file" and "non-empty"
+            st = os.stat(file_path)
+            exists = stat.S_ISREG(st.st_mode) and st.st_size > 0
+            ok &= check_mark(exists, f"{description}: {file_path} ({st.st_size} bytes)")
+        except OSError:
+            ok = check_mark(False, f"{description}: {file_path}")
+        if not ok and _FAST:
+            break
+    
+    return ok
 
 def verify_env():
     """Verify .env.example exists and has required variables."""
     print_section("6. ENVIRONMENT CONFIGURATION")
     
-    env_path = Path('.env.example')
+    env_text = _read_text('.env.example')
     
-    if not env_path.exists():
+    if env_text is None:
         check_mark(False, ".env.example file exists")
         return False
     
@@ -227,77 +435,70 @@ def verify_env():
         'VECTOR_DB_PATH',
     ]
     
-    env_content = env_path.read_text()
+    # Names assigned on non-comment lines; a substring search would also match comments and values
+    defined = {
+        line.split('=', 1)[0].strip()
+        for line in env_text.splitlines()
+        if '=' in line and not line.lstrip().startswith('#')
+    }
     
-    results = []
+    ok = True
     for var in required_vars:
-        has_var = var in env_content
-        results.append(check_mark(has_var, f"Variable: {var}"))
+        ok &= check_mark(var in defined, f"Variable: {var}")
+        if not ok and _FAST:
+            break
     
-    return all(results)
+    return ok
 
 def verify_prompt_templates():
     """Verify all prompt templates are available."""
     print_section("7. PROMPT TEMPLATES")
     
-    try:
-        from src.prompt_library import list_available_schemas
-        
-        schemas = list_available_schemas()
-        expected_schemas = [
-            'generic_extraction',
-            'classification',
-            'qna',
-            'summarization',
-            'action_plan',
-            'rag'
-        ]
-        
-        results = []
-        for schema in expected_schemas:
-            results.append(check_mark(schema in schemas, f"Schema: {schema}"))
-        
-        return all(results)
-    except Exception as e:
-        print(f"{RED}❌{RESET} Failed to check prompt templates: {e}")
+    error, checks = _check_prompt_templates()
+    if error is not None:
+        _emit(f"{RED}❌{RESET} Failed to check prompt templates: {error}\n")
         return False
+    
+    ok = True
+    for schema, available in checks:
+        ok &= check_mark(available, f"Schema: {schema}")
+        if not ok and _FAST:
+            break
+    
+    return ok
 
 def verify_schemas():
     """Verify all Pydantic schemas are available."""
     print_section("8. PYDANTIC SCHEMAS")
     
-    try:
-        from src.schemas import SCHEMA_MODELS
-        
-        expected_schemas = [
-            'generic_extraction',
-            'classification',
-            'qna',
-            'summarization',
-            'action_plan',
-            'rag'
-        ]
-        
-        results = []
-        for schema in expected_schemas:
-            exists = schema in SCHEMA_MODELS
-            results.append(check_mark(exists, f"Model: {schema}"))
-        
-        return all(results)
-    except Exception as e:
-        print(f"{RED}❌{RESET} Failed to check Pydantic schemas: {e}")
+    error, checks = _check_schemas()
+    if error is not None:
+        _emit(f"{RED}❌{RESET} Failed to check Pydantic schemas: {error}\n")
         return False
+    
+    ok = True
+    for schema, exists in checks:
+        ok &= check_mark(exists, f"Model: {schema}")
+        if not ok and _FAST:
+            break
+    
+    return ok
 
 def verify_git():
     """Verify git setup."""
     print_section("9. GIT CONFIGURATION")
     
-    gitignore_path = Path('.gitignore')
-    
-    if gitignore_path.exists():
-        content = gitignore_path.read_text()
-        has_env = '.env' in content
-        has_pycache = '__pycache__' in content
+    gitignore_text = _read_text('.gitignore')
+    
+    if gitignore_text is not None:
+        # Patterns on non-comment lines, without anchoring/directory slashes
+        patterns = {
+            line.strip().strip('/')
+            for line in gitignore_text.splitlines()
+            if line.strip() and not line.lstrip().startswith('#')
+        }
+        has_env = '.env' in patterns
+        has_pycache = '__pycache__' in patterns
         
         check_mark(True, ".gitignore exists")
         check_mark(has_env, ".gitignore includes .env")
@@ -310,10 +511,13 @@ def verify_git():
 
 def main():
     """Run all verifications."""
-    print(f"\n{YELLOW}{'#' * 60}{RESET}")
-    print(f"{YELLOW}# RAG HACKATHON - PRE-FLIGHT VERIFICATION{RESET}")
-    print(f"{YELLOW}# {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}{RESET}")
-    print(f"{YELLOW}{'#' * 60}{RESET}\n")
+    global _FAST
+    _FAST = '--fast' in sys.argv[1:]
+    
+    banner = f"{YELLOW}{'#' * 60}{RESET}"
+    _emit(f"\n{banner}\n{YELLOW}# RAG HACKATHON - PRE-FLIGHT VERIFICATION{RESET}\n")
+    _emit(f"{YELLOW}# {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}{RESET}\n{banner}\n\n")
+    _flush()
     
     checks = [
         ('Folder Structure', verify_structure),
@@ -327,14 +531,40 @@ def main():
         ('Git Setup', verify_git),
     ]
     
-    results = {}
-    for check_name, check_func in checks:
-        try:
-            results[check_name] = check_func()
-        except Exception as e:
-            print(f"\n{RED}❌ {check_name} failed with error: {e}{RESET}")
-            results[check_name] = False
-      # Summary
+    # Phase 1 runs the checks that don't import project code; phase 2 (the
+    # expensive imports) only starts once the folder structure and files pass
+    prerequisites = ('Folder Structure', 'Critical Files')
+    dependents = ('Import Verification', 'Prompt Templates', 'Pydantic Schemas')
+    
+    # Checks run concurrently; each one's output is buffered and printed in list
+    # order. futures maps a check name to (future of its group, index in group).
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = {
+            check_name: (executor.submit(_run_checks, [(check_name, check_func)]), 0)
+            for check_name, check_func in checks
+            if check_name not in dependents
+        }
+        
+        if all(futures[check_name][0].result()[0][0] for check_name in prerequisites):
+            # One group, in order: the template and schema checks reuse the
+            # modules verify_imports has just loaded instead of importing again
+            group = [check for check in checks if check[0] in dependents]
+            future = executor.submit(_run_checks, group)
+            for i, (check_name, _) in enumerate(group):
+                futures[check_name] = (future, i)
+        
+        results = {}
+        for check_name, _ in checks:
+            if check_name in futures:
+                future, i = futures[check_name]
+                results[check_name], text = future.result()[i]
+            else:
+                results[check_name] = False
+                text = f"\n{YELLOW}⚠️  {check_name}: skipped (prereq failed){RESET}\n"
+            sys.stdout.write(text)
+            sys.stdout.flush()
+    
+    # Summary
     print_section("VERIFICATION SUMMARY")
     
     passed = sum(1 for v in results.values() if v)
@@ -342,15 +572,23 @@ def main():
     
     for check_name, result in results.items():
         status = f"{GREEN}PASS{RESET}" if result else f"{RED}FAIL{RESET}"
-        print(f"{status} {check_name}")
+        _emit(f"{status} {check_name}\n")
+    
+    _emit(f"\n{YELLOW}Overall: {passed}/{total} checks passed{RESET}\n")
     
-    print(f"\n{YELLOW}Overall: {passed}/{total} checks passed{RESET}")
+    # --json: machine-readable summary for CI instead of parsing the report
+    if '--json' in sys.argv[1:]:
+        os.makedirs('output', exist_ok=True)
+        with open(os.path.join('output', 'verify.json'), 'w') as f:
+            json.dump({'passed': passed, 'total': total, 'checks': results, 'ts': datetime.now().isoformat()}, f, indent=2)
     
     if passed == total:
-        print(f"\n{GREEN}✅ ALL CHECKS PASSED - YOU'RE READY FOR FRIDAY!{RESET}\n")
+        _emit(f"\n{GREEN}✅ ALL CHECKS PASSED - YOU'RE READY FOR FRIDAY!{RESET}\n\n")
+        _flush()
         return 0
     else:
-        print(f"\n{YELLOW}⚠️  {total - passed} checks need attention. Review errors above.{RESET}\n")
+        _emit(f"\n{YELLOW}⚠️  {total - passed} checks need attention. Review errors above.{RESET}\n\n")
+        _flush()
         return 1
 
 if __name__ == '__main__':